@@ -0,0 +1,118 @@
+"""Per-request overhead of the middleware stack, before and after going pure ASGI.
+
+Drives each stack in-process against a bare ASGI endpoint, so the numbers are
+middleware cost only (no network, routing or handlers). Needs the usual .env.
+
+    python -m benchmarks.middleware_stack [requests]
+"""
+
+import asyncio
+import sys
+import time
+
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.config import Config
+from src.db.query_stats import start_query_stats
+from src.metrics import REQUESTS_IN_FLIGHT
+from src.middleware import (
+    RequestTimingMiddleware,
+    TrustedHostCORSMiddleware,
+    record_request,
+)
+
+ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
+CORS_OPTIONS = dict(
+    allow_origins=["*"],
+    allow_methods=["*"],
+    allow_headers=["*"],
+    allow_credentials=True,
+)
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/api/v1/books/",
+    "raw_path": b"/api/v1/books/",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [
+        (b"host", b"localhost:8000"),
+        (b"accept", b"application/json"),
+        (b"authorization", b"Bearer token"),
+    ],
+    "client": ("127.0.0.1", 50000),
+    "server": ("127.0.0.1", 8000),
+}
+
+
+async def endpoint(scope, receive, send):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def timing_dispatch(request, call_next):
+    """The @app.middleware("http") version this replaced."""
+    start_time = time.perf_counter()
+    query_stats = start_query_stats()
+    status_code = 500
+    REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["Server-Timing"] = query_stats.server_timing(
+            time.perf_counter() - start_time
+        )
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        record_request(
+            request.scope, status_code, time.perf_counter() - start_time, query_stats
+        )
+
+
+def before():
+    app = BaseHTTPMiddleware(endpoint, dispatch=timing_dispatch)
+    app = CORSMiddleware(app, **CORS_OPTIONS)
+    return TrustedHostMiddleware(app, allowed_hosts=ALLOWED_HOSTS)
+
+
+def after():
+    app = RequestTimingMiddleware(endpoint)
+    return TrustedHostCORSMiddleware(app, allowed_hosts=ALLOWED_HOSTS, **CORS_OPTIONS)
+
+
+async def measure(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+async def main(requests: int) -> None:
+    Config.ACCESS_LOG_SAMPLE_RATE = 0.0
+    for name, build in (("before", before), ("after", after)):
+        app = build()
+        await measure(app, requests // 10)
+        per_request = await measure(app, requests)
+        print(f"{name:>6}: {per_request * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,51 @@
+"""unique tag names
+
+Revision ID: b7e2d9a1c4f3
+Revises: a3f1c2d4e5b6
+Create Date: 2026-10-18 10:31:05.447102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d9a1c4f3'
+down_revision: Union[str, Sequence[str], None] = 'a3f1c2d4e5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DUPLICATE_TAGS = """
+    SELECT uid, first_value(uid) OVER (
+        PARTITION BY name ORDER BY created_at, uid
+    ) AS keep_uid
+    FROM tags
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate tags into the oldest one before enforcing uniqueness.
+    op.execute(f"""
+        INSERT INTO booktag (book_id, tag_id)
+        SELECT booktag.book_id, dup.keep_uid
+        FROM booktag JOIN ({DUPLICATE_TAGS}) AS dup ON dup.uid = booktag.tag_id
+        WHERE dup.uid <> dup.keep_uid
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute(f"""
+        DELETE FROM booktag USING ({DUPLICATE_TAGS}) AS dup
+        WHERE booktag.tag_id = dup.uid AND dup.uid <> dup.keep_uid
+    """)
+    op.execute(f"""
+        DELETE FROM tags USING ({DUPLICATE_TAGS}) AS dup
+        WHERE tags.uid = dup.uid AND dup.uid <> dup.keep_uid
+    """)
+    op.create_unique_constraint('uq_tags_name', 'tags', ['name'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_tags_name', 'tags', type_='unique')
@@ -0,0 +1,53 @@
+"""add book rating aggregates
+
+Revision ID: d9a3b5c7e2f1
+Revises: c4d8e1f2a9b0
+Create Date: 2026-10-18 11:40:12.581930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a3b5c7e2f1'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e1f2a9b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('review_count', sa.INTEGER(), server_default='0', nullable=False))
+    op.add_column('books', sa.Column('rating_sum', postgresql.DOUBLE_PRECISION(), server_default='0', nullable=False))
+    op.add_column('books', sa.Column(
+        'avg_rating',
+        postgresql.DOUBLE_PRECISION(),
+        sa.Computed(
+            "CASE WHEN review_count > 0 THEN rating_sum / review_count ELSE 0 END",
+            persisted=True,
+        ),
+        nullable=False,
+    ))
+    op.execute("""
+        UPDATE books
+        SET review_count = totals.review_count, rating_sum = totals.rating_sum
+        FROM (
+            SELECT book_uid, count(*) AS review_count, sum(rating) AS rating_sum
+            FROM reviews
+            GROUP BY book_uid
+        ) AS totals
+        WHERE books.uid = totals.book_uid
+    """)
+    op.create_index('ix_books_avg_rating_uid', 'books', ['avg_rating', 'uid'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_avg_rating_uid', table_name='books')
+    op.drop_column('books', 'avg_rating')
+    op.drop_column('books', 'rating_sum')
+    op.drop_column('books', 'review_count')
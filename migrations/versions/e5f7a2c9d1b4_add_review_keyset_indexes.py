@@ -0,0 +1,30 @@
+"""add review keyset indexes
+
+Revision ID: e5f7a2c9d1b4
+Revises: d9a3b5c7e2f1
+Create Date: 2026-10-18 12:05:33.120487
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f7a2c9d1b4'
+down_revision: Union[str, Sequence[str], None] = 'd9a3b5c7e2f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reviews_created_at_uid', 'reviews', ['created_at', 'uid'], unique=False)
+    op.create_index('ix_reviews_book_uid_created_at_uid', 'reviews', ['book_uid', sa.text('created_at DESC'), sa.text('uid DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reviews_book_uid_created_at_uid', table_name='reviews')
+    op.drop_index('ix_reviews_created_at_uid', table_name='reviews')
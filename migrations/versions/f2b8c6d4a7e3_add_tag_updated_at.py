@@ -0,0 +1,30 @@
+"""add tag updated_at
+
+Revision ID: f2b8c6d4a7e3
+Revises: e5f7a2c9d1b4
+Create Date: 2026-10-18 13:41:08.552310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8c6d4a7e3'
+down_revision: Union[str, Sequence[str], None] = 'e5f7a2c9d1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tags', sa.Column('updated_at', postgresql.TIMESTAMP(), nullable=True))
+    op.execute('UPDATE tags SET updated_at = created_at')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tags', 'updated_at')
@@ -5,16 +5,32 @@ from .middleware import register_middleware
 from .errors import register_error_handlers
 from src.reviews.routes import review_router
 from src.tags.routes import tags_router
-from contextlib import asynccontextmanager
-from src.db.main import init_db
+from src.db.routes import db_router
+from src.metrics import mark_process_dead, metrics_router
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from src.access_log import start_access_log, stop_access_log
+from src.db.redis import revocation_cache
+from src.tags.service import refresh_tag_index_forever
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Server is starting...")
-    await init_db()
+    start_access_log()
+    background_tasks = [
+        asyncio.create_task(revocation_cache.listen()),
+        asyncio.create_task(refresh_tag_index_forever()),
+    ]
     yield
     print("Server is shutting down...")
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    stop_access_log()
+    mark_process_dead()
 
 
 version = "v1"
@@ -22,7 +38,7 @@ app = FastAPI(
     title="Book Management API",
     version=version,
     description="An API to manage a collection of books.",
-    # lifespan=lifespan,
+    lifespan=lifespan,
 )
 
 
@@ -33,3 +49,5 @@ app.include_router(auth_router, prefix=f"/api/{version}/auth", tags=["auth"])
 app.include_router(book_router, prefix=f"/api/{version}/books", tags=["books"])
 app.include_router(review_router, prefix=f"/api/{version}/reviews", tags=["reviews"])
 app.include_router(tags_router, prefix=f"/api/{version}/tags", tags=["tags"])
+app.include_router(db_router, prefix=f"/api/{version}/db", tags=["db"])
+app.include_router(metrics_router)
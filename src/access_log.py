@@ -0,0 +1,118 @@
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from src.config import Config
+from src.metrics import ACCESS_LOG_DROPPED
+
+access_logger = logging.getLogger("bookly.access")
+access_logger.setLevel(logging.INFO)
+access_logger.propagate = False
+
+logger = logging.getLogger(__name__)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line from the record's `access` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            **getattr(record, "access", {}),
+        }
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the listener thread untouched; drops them when full.
+
+    Formatting happens on the listener thread, so a request only pays for
+    building the record and a non-blocking put.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            ACCESS_LOG_DROPPED.inc()
+
+
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(JsonFormatter())
+
+access_queue_handler = DroppingQueueHandler(
+    queue.Queue(maxsize=Config.ACCESS_LOG_QUEUE_SIZE)
+)
+access_logger.addHandler(access_queue_handler)
+
+_listener = QueueListener(access_queue_handler.queue, _stream_handler)
+_listener_running = False
+
+
+def start_access_log() -> None:
+    global _listener_running
+    if not _listener_running:
+        _listener.start()
+        _listener_running = True
+
+
+def stop_access_log() -> None:
+    """Flush queued records, stop the writer thread and report any drops."""
+    global _listener_running
+    if not _listener_running:
+        return
+    _listener.stop()
+    _listener_running = False
+    if access_queue_handler.dropped:
+        logger.warning(
+            f"Dropped {access_queue_handler.dropped} access log records "
+            "because the log queue was full"
+        )
+
+
+def should_log(status_code: int, duration: float) -> bool:
+    """Errors and slow requests always; everything else at the sample rate."""
+    if status_code >= 400 or duration >= Config.ACCESS_LOG_SLOW_SECONDS:
+        return True
+    return random.random() < Config.ACCESS_LOG_SAMPLE_RATE
+
+
+def log_request(
+    method: str,
+    path: str,
+    status_code: int,
+    duration: float,
+    client: str | None,
+    **fields,
+) -> None:
+    if not should_log(status_code, duration):
+        return
+    level = logging.ERROR if status_code >= 500 else logging.INFO
+    access_logger.log(
+        level,
+        "request",
+        extra={
+            "access": {
+                "client": client,
+                "method": method,
+                "path": path,
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "slow": duration >= Config.ACCESS_LOG_SLOW_SECONDS,
+                **fields,
+            }
+        },
+    )
@@ -5,6 +5,7 @@ from .utils import decode_access_token
 from src.db.redis import is_token_in_blocklist
 from src.db.main import get_session
 from sqlalchemy.ext.asyncio.session import AsyncSession
+from .schemas import UserPrincipal
 from .service import UserService
 from src.errors import (
     InvalidToken,
@@ -24,15 +25,22 @@ class TokenBearer(HTTPBearer):
     async def __call__(self, request: Request) -> HTTPAuthorizationCredentials | None:
         creds = await super().__call__(request)
         token = creds.credentials
-        token_data = decode_access_token(token)
 
-        if not token or not self.token_valid(token):
-            raise InvalidToken()
+        # Several dependencies of one route authenticate the same token;
+        # only the first one decodes it and checks the blocklist.
+        if getattr(request.state, "token", None) == token:
+            token_data = request.state.token_data
+        else:
+            token_data = decode_access_token(token)
+            if not token or token_data is None:
+                raise InvalidToken()
 
-        if await is_token_in_blocklist(token_data["jti"]):
-            raise InvalidToken()
+            if await is_token_in_blocklist(token_data["jti"]):
+                raise InvalidToken()
 
         self.verify_token_data(token_data)
+        request.state.token = token
+        request.state.token_data = token_data
         return token_data
 
     def token_valid(self, token: str) -> bool:
@@ -58,9 +66,9 @@ class RefreshTokenBearer(TokenBearer):
 async def get_current_user(
     token_details: dict = Depends(AccessTokenBearer()),
     session: AsyncSession = Depends(get_session),
-) -> dict:
-    user_email = token_details["user"]["email"]
-    user = await user_service.get_user_by_email(user_email, session)
+) -> UserPrincipal:
+    user_uid = token_details["user"]["user_uid"]
+    user = await user_service.get_user_principal(user_uid, session)
     if not user:
         raise UserNotFound()
     return user
@@ -70,7 +78,9 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]):
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user: dict = Depends(get_current_user)) -> bool:
+    def __call__(
+        self, current_user: UserPrincipal = Depends(get_current_user)
+    ) -> bool:
         if current_user.role in self.allowed_roles:
             return True
         raise InsufficientPermission()
@@ -1,33 +1,48 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Response, status, Depends
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.errors import InvalidCredentials, InvalidToken, UserAlreadyExists
+from src.errors import (
+    InvalidCredentials,
+    InvalidToken,
+    UserAlreadyExists,
+    UserNotFound,
+)
 from .dependencies import (
     RefreshTokenBearer,
     AccessTokenBearer,
     RoleChecker,
-    get_current_user,
 )
-from src.db.main import get_session
+from src.db.main import get_read_session, get_session
+from src.db.serialization import json_response
 from .schemas import UserBooksModel, UserCreateModel, UserLoginModel, UserModel
 from .service import UserService
 from .utils import verify_password, create_access_token
 from datetime import datetime, timedelta
 from src.db.redis import add_jti_to_blocklist
+from src.config import Config
+from src.rate_limit import RateLimiter
 
 auth_router = APIRouter()
 user_service = UserService()
 REFRESH_TOKEN_EXPIRY_IN_DAYS = 2
 role_checker = RoleChecker(allowed_roles=["admin", "user"])
+signup_limiter = RateLimiter("signup", Config.RATE_LIMIT_SIGNUP)
+login_ip_limiter = RateLimiter("login_ip", Config.RATE_LIMIT_LOGIN_IP)
+login_email_limiter = RateLimiter("login_email", Config.RATE_LIMIT_LOGIN_EMAIL)
 
 
 @auth_router.post(
-    "/signup", status_code=status.HTTP_201_CREATED, response_model=UserModel
+    "/signup",
+    status_code=status.HTTP_201_CREATED,
+    response_model=UserModel,
+    dependencies=[Depends(signup_limiter)],
 )
 async def create_user_account(
-    user_data: UserCreateModel, session: AsyncSession = Depends(get_session)
-):
+    user_data: UserCreateModel,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
+) -> Response:
     email = user_data.email
 
     is_user_exist = await user_service.user_exist(email, session)
@@ -36,20 +51,34 @@ async def create_user_account(
         raise UserAlreadyExists()
 
     new_user = await user_service.create_user(user_data, session)
-    return new_user
+    # Returning a Response drops the injected one, so carry the RateLimit-*
+    # headers the limiter set on it.
+    return json_response(
+        UserModel, new_user, status.HTTP_201_CREATED, dict(response.headers)
+    )
 
 
-@auth_router.post("/login", status_code=status.HTTP_200_OK)
+@auth_router.post(
+    "/login",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(login_ip_limiter)],
+)
 async def login_users(
-    login_data: UserLoginModel, session: AsyncSession = Depends(get_session)
+    login_data: UserLoginModel,
+    response: Response,
+    session: AsyncSession = Depends(get_session),
 ):
     email = login_data.email
     password = login_data.password
 
+    # Per-account limit on top of the per-IP one, so a botnet spreading one
+    # account's guesses across many addresses still runs dry.
+    await login_email_limiter.hit(email.lower(), response)
+
     user = await user_service.get_user_by_email(email, session)
 
     if user is not None:
-        password_valid = verify_password(password, user.password_hash)
+        password_valid = await verify_password(password, user.password_hash)
 
         if password_valid:
             user_data = {
@@ -65,15 +94,14 @@ async def login_users(
                 expiry=timedelta(days=REFRESH_TOKEN_EXPIRY_IN_DAYS),
             )
 
-            return JSONResponse(
-                content={
-                    "success": True,
-                    "message": "Login successful",
-                    "user": user_data,
-                    "access_token": access_token,
-                    "refresh_token": refresh_token,
-                }
-            )
+            # A plain dict, so the RateLimit-* headers set on response apply.
+            return {
+                "success": True,
+                "message": "Login successful",
+                "user": user_data,
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+            }
 
     raise InvalidCredentials()
 
@@ -110,9 +138,16 @@ async def logout(token_details: dict = Depends(AccessTokenBearer())):
 
 @auth_router.get("/me", response_model=UserBooksModel)
 async def get_current_user(
-    current_user: dict = Depends(get_current_user), _: bool = Depends(role_checker)
-):
-    return current_user
+    _: bool = Depends(role_checker),
+    token_details: dict = Depends(AccessTokenBearer()),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    current_user = await user_service.get_user_by_email(
+        token_details["user"]["email"], session, include=("books", "reviews")
+    )
+    if not current_user:
+        raise UserNotFound()
+    return json_response(UserBooksModel, current_user)
 
 
 @auth_router.post("/reset-password")
@@ -20,6 +20,13 @@ class UserModel(BaseModel):
     updated_at: datetime
 
 
+class UserPrincipal(BaseModel):
+    uid: uuid.UUID
+    email: EmailStr
+    role: str
+    is_verified: bool
+
+
 class UserBooksModel(UserModel):
     books: List[Book]
     reviews: List[ReviewModel]
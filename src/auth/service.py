@@ -1,18 +1,90 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from typing import Sequence
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.config import Config
+from src.db.includes import include_options
+from src.db.main import INVALIDATED_PRINCIPALS
 from src.db.models import User
-from .schemas import UserCreateModel
+from src.db.redis import revocation_cache
+from .schemas import UserCreateModel, UserPrincipal
 from sqlmodel import select
 from src.auth.utils import hash_password
 
 
+class PrincipalCache:
+    """Short-lived per-worker cache of user principals keyed by user uid."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, UserPrincipal]] = {}
+
+    def get(self, user_uid: str) -> UserPrincipal | None:
+        entry = self._entries.get(user_uid)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_uid]
+            return None
+        return principal
+
+    def put(self, principal: UserPrincipal) -> None:
+        self._entries[str(principal.uid)] = (time.monotonic() + self.ttl, principal)
+
+    def invalidate(self, user_uid: str) -> None:
+        self._entries.pop(str(user_uid), None)
+
+
+principal_cache = PrincipalCache(ttl=Config.USER_PRINCIPAL_TTL_SECONDS)
+revocation_cache.on_principal_invalidated = principal_cache.invalidate
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, user: User) -> None:
+    principal_cache.invalidate(user.uid)
+    # Other workers drop theirs once PrimarySession.commit publishes this.
+    session = object_session(user)
+    if session is not None:
+        session.info.setdefault(INVALIDATED_PRINCIPALS, set()).add(str(user.uid))
+
+
 class UserService:
-    async def get_user_by_email(self, email: str, session: AsyncSession):
+    async def get_user_by_email(
+        self, email: str, session: AsyncSession, include: Sequence[str] = ()
+    ):
         """Retrieve a user by email."""
-        statement = select(User).where(User.email == email)
+        statement = (
+            select(User)
+            .where(User.email == email)
+            .options(*include_options(User, include))
+        )
         result = await session.execute(statement)
         result = result.scalars().first()
         return result
 
+    async def get_user_principal(
+        self, user_uid: str, session: AsyncSession
+    ) -> UserPrincipal | None:
+        """Retrieve only what authorization needs, without relationships."""
+        principal = principal_cache.get(user_uid)
+        if principal is not None:
+            return principal
+
+        statement = select(User.uid, User.email, User.role, User.is_verified).where(
+            User.uid == user_uid
+        )
+        result = await session.execute(statement)
+        row = result.first()
+        if row is None:
+            return None
+
+        principal = UserPrincipal.model_validate(row, from_attributes=True)
+        principal_cache.put(principal)
+        return principal
+
     async def user_exist(self, email: str, session: AsyncSession):
         """Check if a user exists by email."""
         user = await self.get_user_by_email(email, session)
@@ -25,7 +97,7 @@ class UserService:
         new_user = User(
             **user_data_dict,
         )
-        new_user.password_hash = hash_password(user_data_dict["password"])
+        new_user.password_hash = await hash_password(user_data_dict["password"])
         new_user.role = "user"
         session.add(new_user)
         await session.commit()
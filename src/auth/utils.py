@@ -1,9 +1,18 @@
-from fastapi import logger
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi.logger import logger
 from pwdlib import PasswordHash
 from datetime import timedelta, datetime
 import jwt
+import time
 import uuid
 from src.config import Config
+from src.metrics import (
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_JOBS,
+    PASSWORD_HASH_QUEUED,
+)
 
 
 passwd_context = PasswordHash.recommended()
@@ -11,14 +20,96 @@ passwd_context = PasswordHash.recommended()
 ACCESS_TOKEN_EXPIRY_MINUTES = 3600
 
 
-def hash_password(password: str) -> str:
+class VerifiedTokenCache:
+    """Bounded LRU of verified token claims, each dropped at the token's exp."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+
+    def get(self, token: str) -> dict | None:
+        claims = self._entries.get(token)
+        if claims is None:
+            return None
+        if claims["exp"] <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        if self.maxsize <= 0 or "exp" not in claims:
+            return
+        self._entries[token] = claims
+        self._entries.move_to_end(token)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+verified_tokens = VerifiedTokenCache(maxsize=Config.TOKEN_CACHE_SIZE)
+
+
+class PasswordExecutor:
+    """Bounded pool that keeps Argon2 work off the event loop.
+
+    Argon2 releases the GIL, so threads are the default; a process pool can
+    be selected when hashing should not share a core with the worker.
+
+    The executor's submit queue is left unbounded: every job belongs to a
+    signup or login request, and those routes are rate limited, so the
+    backlog is bounded by concurrent requests. Refusing jobs would only turn
+    a slow login into a failed one; password_hash_queued shows the backlog.
+    """
+
+    def __init__(self, kind: str, workers: int):
+        self.workers = workers
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password"
+            )
+        self.in_flight = 0
+
+    async def run(self, fn, *args):
+        self._track(1)
+        outcome = "error"
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, fn, *args)
+            outcome = "ok"
+            return result
+        finally:
+            self._track(-1)
+            PASSWORD_HASH_JOBS.labels(outcome).inc()
+
+    def _track(self, delta: int) -> None:
+        self.in_flight += delta
+        PASSWORD_HASH_IN_FLIGHT.inc(delta)
+        PASSWORD_HASH_QUEUED.set(max(0, self.in_flight - self.workers))
+
+
+password_executor = PasswordExecutor(
+    kind=Config.PASSWORD_HASH_EXECUTOR, workers=Config.PASSWORD_HASH_WORKERS
+)
+
+
+def _hash(password: str) -> str:
     return passwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return passwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password(password: str) -> str:
+    return await password_executor.run(_hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_executor.run(_verify, plain_password, hashed_password)
+
+
 def create_access_token(
     user_data: dict, expiry: timedelta = None, refresh: bool = False
 ) -> str:
@@ -39,13 +130,17 @@ def create_access_token(
 
 
 def decode_access_token(token: str) -> dict:
-    """Decode a JWT access token."""
+    """Decode a JWT access token, reusing claims already verified."""
+    payload = verified_tokens.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(
             jwt=token,
             key=Config.JWT_SECRET,
             algorithms=[Config.JWT_ALGORITHM],
         )
+        verified_tokens.put(token, payload)
         return payload
     except jwt.PyJWTError as e:
         logger.error(f"JWT Error: {e}")
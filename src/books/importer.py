@@ -0,0 +1,84 @@
+import csv
+import json
+from typing import AsyncIterator, Tuple
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a streamed request body into raw lines without buffering it all.
+
+    Lines are left undecoded so the parsers can report bad bytes per row.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if pending:
+        yield pending.rstrip(b"\r")
+
+
+def decode_line(line: bytes) -> Tuple[str | None, str | None]:
+    """(text, None) for a UTF-8 line, else (None, parse error)."""
+    try:
+        return line.decode("utf-8"), None
+    except UnicodeDecodeError as e:
+        return None, f"invalid UTF-8: {e.reason} at byte {e.start}"
+
+
+async def iter_ndjson_rows(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, dict | None, str | None]]:
+    """Yield (row number, record, parse error) for each non-blank NDJSON line."""
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        text, error = decode_line(line)
+        if error is not None:
+            yield row_number, None, error
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "expected a JSON object"
+            continue
+        yield row_number, record, None
+
+
+async def iter_csv_rows(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, dict | None, str | None]]:
+    """Yield (row number, record, parse error) for each CSV data row.
+
+    The first line is the header. Records must not span lines. A header that
+    is not UTF-8 is reported as row 0 and ends the import, since no row can
+    be read without it.
+    """
+    header = None
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        text, error = decode_line(line)
+        if header is None:
+            if error is not None:
+                yield 0, None, f"header: {error}"
+                return
+            header = [name.strip() for name in next(csv.reader([text]))]
+            continue
+        row_number += 1
+        if error is not None:
+            yield row_number, None, error
+            continue
+        values = next(csv.reader([text]))
+        if len(values) != len(header):
+            yield row_number, None, (
+                f"expected {len(header)} columns, got {len(values)}"
+            )
+            continue
+        yield row_number, dict(zip(header, values)), None
@@ -1,67 +1,277 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
-from src.books.schemas import Book, BookCreateModel, BookDetailModel, BookUpdateModel
-from src.books.service import BookService
+import uuid
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from src.books.schemas import (
+    Book,
+    BookCreateModel,
+    BookDetailModel,
+    BookImportReport,
+    BookPageModel,
+    BookSearchPageModel,
+    BookUpdateModel,
+    book_model_with,
+)
+from src.books.importer import iter_csv_rows, iter_ndjson_rows
+from src.books.service import BookService, page_version
+from src.reviews.service import ReviewService
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.main import get_session
+from src.db.fields import FieldsParam, sparse_model
+from src.db.includes import IncludeParam
+from src.db.main import get_read_session, get_session
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.db.redis import cache_book, get_book_generation, get_cached_book
+from src.db.etags import cache_headers, etag_matches, not_modified, weak_etag
+from src.db.serialization import json_response, page_model
 from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.compression import accepted_encoding, compressed_variants, variant_response
+from src.config import Config
 from src.errors import BookNotFound
+from src.rate_limit import RateLimiter, user_uid
 
 book_router = APIRouter()
 book_service = BookService()
+review_service = ReviewService()
 access_token_bearer = AccessTokenBearer()
 role_checker = Depends(RoleChecker(allowed_roles=["admin", "user"]))
+admin_role_checker = Depends(RoleChecker(allowed_roles=["admin"]))
+book_includes = IncludeParam("reviews", "tags")
+book_fields = FieldsParam(Book)
+book_create_limiter = RateLimiter(
+    "book_create", Config.RATE_LIMIT_BOOK_CREATE, user_uid
+)
+
 
+EXPORT_LINES_PER_CHUNK = 100
+DETAIL_REVIEW_COUNT = 10
 
-@book_router.get("/", response_model=List[Book], dependencies=[role_checker])
+
+@book_router.get("/", response_model=BookPageModel, dependencies=[role_checker])
 async def get_all_books(
-    db_session: AsyncSession = Depends(get_session),
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Literal["newest", "top_rated"] = "newest",
+    include: tuple = Depends(book_includes),
+    fields: tuple = Depends(book_fields),
+    db_session: AsyncSession = Depends(get_read_session),
     _: dict = Depends(access_token_bearer),
-) -> List[Book]:
-    books = await book_service.get_all_books(db_session)
-    return books
+):
+    """List books; fields, when given, takes precedence over include."""
+    if request.headers.get("if-none-match"):
+        version = await book_service.get_book_page_version(
+            db_session, limit, cursor, sort
+        )
+        headers = cache_headers(weak_etag(version), Config.CACHE_CONTROL_BOOK_LIST)
+        if etag_matches(request, headers["ETag"]):
+            return not_modified(headers)
+
+    books, next_cursor = await book_service.get_all_books(
+        db_session, limit, cursor, include, fields, sort
+    )
+    version = page_version(books, next_cursor)
+    headers = cache_headers(weak_etag(version), Config.CACHE_CONTROL_BOOK_LIST)
+    item = sparse_model(Book, fields) if fields else book_model_with(include)
+    return json_response(
+        page_model(item),
+        {"items": books, "next_cursor": next_cursor},
+        headers=headers,
+    )
 
 
 @book_router.get(
-    "/user/{user_uid}", response_model=List[Book], dependencies=[role_checker]
+    "/user/{user_uid}", response_model=BookPageModel, dependencies=[role_checker]
 )
 async def get_user_book_submissions(
+    request: Request,
     user_uid: str,
-    db_session: AsyncSession = Depends(get_session),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include: tuple = Depends(book_includes),
+    fields: tuple = Depends(book_fields),
+    db_session: AsyncSession = Depends(get_read_session),
+    _: dict = Depends(access_token_bearer),
+):
+    """List a user's books; fields, when given, takes precedence over include."""
+    if request.headers.get("if-none-match"):
+        version = await book_service.get_book_page_version(
+            db_session, limit, cursor, user_uid=user_uid
+        )
+        headers = cache_headers(weak_etag(version), Config.CACHE_CONTROL_BOOK_LIST)
+        if etag_matches(request, headers["ETag"]):
+            return not_modified(headers)
+
+    books, next_cursor = await book_service.get_user_books(
+        user_uid, db_session, limit, cursor, include, fields
+    )
+    version = page_version(books, next_cursor)
+    headers = cache_headers(weak_etag(version), Config.CACHE_CONTROL_BOOK_LIST)
+    item = sparse_model(Book, fields) if fields else book_model_with(include)
+    return json_response(
+        page_model(item),
+        {"items": books, "next_cursor": next_cursor},
+        headers=headers,
+    )
+
+
+@book_router.get(
+    "/search", response_model=BookSearchPageModel, dependencies=[role_checker]
+)
+async def search_books(
+    q: str = Query(..., min_length=1),
+    language: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db_session: AsyncSession = Depends(get_read_session),
+    _: dict = Depends(access_token_bearer),
+) -> Response:
+    rows, next_cursor = await book_service.search_books(
+        q, db_session, limit, cursor, language, tag
+    )
+    return json_response(
+        BookSearchPageModel, {"items": rows, "next_cursor": next_cursor}
+    )
+
+
+@book_router.get("/export", dependencies=[role_checker])
+async def export_books(
+    owner: Optional[uuid.UUID] = None,
+    language: Optional[str] = None,
+    updated_since: Optional[datetime] = None,
+    db_session: AsyncSession = Depends(get_read_session),
     _: dict = Depends(access_token_bearer),
-) -> List[Book]:
-    books = await book_service.get_user_books(user_uid, db_session)
-    return books
+) -> StreamingResponse:
+    """Stream matching books as NDJSON, one Book object per line."""
+    books = book_service.stream_books(db_session, owner, language, updated_since)
+
+    async def ndjson():
+        lines = []
+        async for book in books:
+            line = Book.model_validate(book, from_attributes=True).model_dump_json()
+            lines.append(line)
+            if len(lines) == EXPORT_LINES_PER_CHUNK:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 
 @book_router.get(
     "/{book_id}", response_model=BookDetailModel, dependencies=[role_checker]
 )
 async def view_book_detail(
+    request: Request,
     book_id: str,
     db_session: AsyncSession = Depends(get_session),
     _: dict = Depends(access_token_bearer),
-) -> dict:
-    book = await book_service.get_book(book_id, db_session)
-    if book is not None:
-        return book
-    raise BookNotFound()
+) -> Response:
+    # Misses are read from the primary: an entry filled from a lagging
+    # replica would outlive the invalidation that followed the write.
+    try:
+        cached = await get_cached_book(book_id)
+    except ValueError:
+        raise BookNotFound()
+    if cached is not None:
+        headers = cache_headers(cached["etag"], Config.CACHE_CONTROL_BOOK_DETAIL)
+        if etag_matches(request, cached["etag"]):
+            return not_modified(headers)
+        return variant_response(cached, accepted_encoding(request), headers)
+
+    if request.headers.get("if-none-match"):
+        # Revalidation on a cache miss: one primary-key lookup decides
+        # whether the full load is needed at all.
+        updated_at = await book_service.get_book_version(book_id, db_session)
+        if updated_at is None:
+            raise BookNotFound()
+        etag = weak_etag(updated_at)
+        if etag_matches(request, etag):
+            return not_modified(cache_headers(etag, Config.CACHE_CONTROL_BOOK_DETAIL))
+
+    generation = await get_book_generation(book_id)
+    book = await book_service.get_book(book_id, db_session, include=("tags",))
+    if book is None:
+        raise BookNotFound()
+
+    # Only the newest reviews are embedded; the cursor continues at
+    # GET /reviews/book/{book_uid}.
+    reviews, reviews_next_cursor = await review_service.get_books_reviews(
+        book.uid, db_session, DETAIL_REVIEW_COUNT
+    )
+    payload = BookDetailModel.model_validate(
+        {
+            **{name: getattr(book, name) for name in Book.model_fields},
+            "tags": book.tags,
+            "reviews": reviews,
+            "reviews_next_cursor": reviews_next_cursor,
+        },
+        from_attributes=True,
+    )
+    content = payload.model_dump_json().encode()
+    etag = weak_etag(book.updated_at)
+    # Compressed once here and stored with the entry, so hits skip the work.
+    variants = compressed_variants(content)
+    await cache_book(book_id, content, etag, variants, generation)
+    return variant_response(
+        {"body": content, **variants},
+        accepted_encoding(request),
+        cache_headers(etag, Config.CACHE_CONTROL_BOOK_DETAIL),
+    )
 
 
 @book_router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
     response_model=Book,
-    dependencies=[role_checker],
+    dependencies=[role_checker, Depends(book_create_limiter)],
 )
 async def create_book(
     payload: BookCreateModel,
+    response: Response,
     db_session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
-) -> dict:
+) -> Response:
     user_uid = token_details.get("user")["user_uid"]
     new_book = await book_service.create_book(payload, user_uid, db_session)
-    return new_book
+    # Returning a Response drops the injected one, so carry the RateLimit-*
+    # headers the limiter set on it.
+    return json_response(
+        Book, new_book, status.HTTP_201_CREATED, dict(response.headers)
+    )
+
+
+@book_router.post(
+    "/import",
+    status_code=status.HTTP_201_CREATED,
+    response_model=BookImportReport,
+    dependencies=[role_checker],
+)
+async def import_books(
+    request: Request,
+    db_session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+) -> Response:
+    """Bulk-create books from a streamed text/csv or application/x-ndjson body."""
+    user_uid = token_details.get("user")["user_uid"]
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("text/csv"):
+        rows = iter_csv_rows(request.stream())
+    else:
+        rows = iter_ndjson_rows(request.stream())
+    report = await book_service.import_books(rows, user_uid, db_session)
+    return json_response(BookImportReport, report, status.HTTP_201_CREATED)
+
+
+@book_router.post("/ratings/recompute", dependencies=[admin_role_checker])
+async def recompute_book_ratings(
+    db_session: AsyncSession = Depends(get_session),
+) -> dict:
+    """Repair review_count/rating_sum drift against the reviews table."""
+    repaired = await book_service.recompute_rating_aggregates(db_session)
+    return {"repaired": repaired}
 
 
 @book_router.patch("/{book_id}", response_model=Book, dependencies=[role_checker])
@@ -69,10 +279,10 @@ async def update_book(
     book_id: str,
     payload: BookUpdateModel,
     db_session: AsyncSession = Depends(get_session),
-) -> dict:
+) -> Response:
     updated_book = await book_service.update_book(book_id, payload, db_session)
     if updated_book is not None:
-        return updated_book
+        return json_response(Book, updated_book)
     raise BookNotFound()
 
 
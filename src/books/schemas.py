@@ -1,7 +1,8 @@
 import uuid
 from datetime import date, datetime
-from pydantic import BaseModel
-from typing import List
+from functools import lru_cache
+from pydantic import BaseModel, SerializeAsAny, create_model
+from typing import List, Optional, Tuple
 from src.reviews.schemas import ReviewModel
 from src.tags.schemas import TagModel
 
@@ -14,15 +15,44 @@ class Book(BaseModel):
     published_date: date
     page_count: int
     language: str
+    avg_rating: float
+    review_count: int
     created_at: datetime
     updated_at: datetime
 
 
+class BookPageModel(BaseModel):
+    items: List[SerializeAsAny[Book]]
+    next_cursor: Optional[str] = None
+
+
+class BookSearchResult(Book):
+    rank: float
+
+
+class BookSearchPageModel(BaseModel):
+    items: List[BookSearchResult]
+    next_cursor: Optional[str] = None
+
+
 class BookDetailModel(Book):
     reviews: List[ReviewModel]
+    reviews_next_cursor: Optional[str] = None
     tags: List[TagModel]
 
 
+BOOK_INCLUDES = {"reviews": List[ReviewModel], "tags": List[TagModel]}
+
+
+@lru_cache
+def book_model_with(include: Tuple[str, ...]) -> type[Book]:
+    """Book response model extended with the requested relationships."""
+    if not include:
+        return Book
+    fields = {name: (BOOK_INCLUDES[name], ...) for name in include}
+    return create_model(f"Book_{'_'.join(include)}", __base__=Book, **fields)
+
+
 class BookCreateModel(BaseModel):
     title: str
     author: str
@@ -38,3 +68,14 @@ class BookUpdateModel(BaseModel):
     publisher: str
     page_count: int
     language: str
+
+
+class BookImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class BookImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[BookImportRowError]
@@ -1,31 +1,221 @@
-from datetime import datetime
-from sqlmodel import desc, select
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from pydantic import ValidationError
+from sqlalchemy import exists, func, insert, update
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.models import Book
-from .schemas import BookCreateModel, BookUpdateModel
+from src.db.includes import include_options
+from src.db.models import Book, BookTag, Review, Tag
+from src.db.pagination import (
+    paginate,
+    paginate_by_rank,
+    split_page,
+    split_rank_page,
+)
+from src.db.redis import invalidate_book_cache, invalidate_book_caches
+from .schemas import BookCreateModel, BookImportReport, BookUpdateModel
+
+EXPORT_BATCH_SIZE = 1000
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_IMPORT_ERRORS = 1000
+# rating_sum is a double maintained incrementally, so it can differ from a
+# fresh sum(rating) in the last bits without being wrong.
+RATING_SUM_TOLERANCE = 1e-6
+BOOK_IMPORT_COLUMNS = [
+    "uid",
+    "title",
+    "author",
+    "publisher",
+    "published_date",
+    "page_count",
+    "language",
+    "user_uid",
+    "created_at",
+    "updated_at",
+]
+
+
+def select_books(include: Sequence[str] = (), fields: Sequence[str] = ()):
+    """Select whole Book entities, or only the requested columns as rows.
+
+    Column projections always carry the columns the page cursors are keyed on,
+    and updated_at for the page version.
+    """
+    if fields:
+        columns = {*fields, "created_at", "uid", "avg_rating", "updated_at"}
+        return select(*(c for c in Book.__table__.c if c.name in columns))
+    return select(Book).options(*include_options(Book, include))
+
+
+def page_version(rows: Sequence, next_cursor: Optional[str]) -> str:
+    """What a page's body depends on: each row's (uid, updated_at) and where
+    the next page starts."""
+    return ",".join(
+        [*(f"{row.uid}@{row.updated_at}" for row in rows), str(next_cursor)]
+    )
 
 
 class BookService:
-    async def get_all_books(self, db_session: AsyncSession):
-        statement = select(Book).order_by(desc(Book.created_at))
+    def _page_statement(
+        self, statement, limit: int, cursor: Optional[str], sort: str
+    ):
+        if sort == "top_rated":
+            return paginate_by_rank(
+                statement, Book.avg_rating, Book.uid, limit, cursor
+            )
+        return paginate(statement, Book.created_at, Book.uid, limit, cursor)
+
+    async def _get_book_page(
+        self,
+        statement,
+        db_session: AsyncSession,
+        limit: int,
+        cursor: Optional[str],
+        fields: Sequence[str],
+        sort: str = "newest",
+    ):
+        statement = self._page_statement(statement, limit, cursor, sort)
         result = await db_session.execute(statement)
-        return result.scalars().all()
+        rows = result.all() if fields else result.scalars().all()
+        if sort == "top_rated":
+            return split_rank_page(rows, limit, "avg_rating")
+        return split_page(rows, limit)
 
-    async def get_user_books(self, user_uid: str, db_session: AsyncSession):
-        statement = (
-            select(Book)
-            .where(Book.user_uid == user_uid)
-            .order_by(desc(Book.created_at))
+    async def get_book_page_version(
+        self,
+        db_session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: str = "newest",
+        user_uid: Optional[str] = None,
+    ) -> str:
+        """page_version of a page without loading it, for revalidation.
+
+        Walks the same keyset index as the page itself but reads only the
+        version and cursor columns.
+        """
+        statement = select(Book.uid, Book.updated_at, Book.created_at, Book.avg_rating)
+        if user_uid is not None:
+            statement = statement.where(Book.user_uid == user_uid)
+        rows, next_cursor = await self._get_book_page(
+            statement, db_session, limit, cursor, ("uid", "updated_at"), sort
         )
+        return page_version(rows, next_cursor)
+
+    async def get_all_books(
+        self,
+        db_session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        include: Sequence[str] = (),
+        fields: Sequence[str] = (),
+        sort: str = "newest",
+    ):
+        """Return one page of books, newest or top rated first, and the next-page cursor."""
+        statement = select_books(include, fields)
+        return await self._get_book_page(
+            statement, db_session, limit, cursor, fields, sort
+        )
+
+    async def get_user_books(
+        self,
+        user_uid: str,
+        db_session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        include: Sequence[str] = (),
+        fields: Sequence[str] = (),
+    ):
+        """Return one page of a user's books, newest first, and the next-page cursor."""
+        statement = select_books(include, fields).where(Book.user_uid == user_uid)
+        return await self._get_book_page(statement, db_session, limit, cursor, fields)
+
+    async def search_books(
+        self,
+        query: str,
+        db_session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        language: Optional[str] = None,
+        tag: Optional[str] = None,
+    ):
+        """Full-text search over title, author and publisher, best match first.
+
+        Pages are keyed on (rank, uid), so the cursor carries the last rank.
+        """
+        search_vector = Book.__table__.c.search_vector
+        ts_query = func.websearch_to_tsquery("simple", query)
+        rank = func.ts_rank(search_vector, ts_query)
+
+        columns = [c for c in Book.__table__.c if c is not search_vector]
+        statement = select(*columns, rank.label("rank")).where(
+            search_vector.op("@@")(ts_query)
+        )
+        if language is not None:
+            statement = statement.where(Book.language == language)
+        if tag is not None:
+            statement = statement.where(
+                Book.uid.in_(
+                    select(BookTag.book_id)
+                    .join(Tag, Tag.uid == BookTag.tag_id)
+                    .where(Tag.name == tag)
+                )
+            )
+        statement = paginate_by_rank(statement, rank, Book.uid, limit, cursor)
+
         result = await db_session.execute(statement)
-        return result.scalars().all()
+        return split_rank_page(result.all(), limit, "rank")
+
+    async def stream_books(
+        self,
+        db_session: AsyncSession,
+        owner: Optional[str] = None,
+        language: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+    ) -> AsyncIterator[Book]:
+        """Yield matching books from a server-side cursor, oldest first."""
+        statement = select(Book).order_by(Book.created_at, Book.uid)
+        if owner is not None:
+            statement = statement.where(Book.user_uid == owner)
+        if language is not None:
+            statement = statement.where(Book.language == language)
+        if updated_since is not None:
+            statement = statement.where(Book.updated_at >= updated_since)
+
+        result = await db_session.stream_scalars(
+            statement.execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for book in result:
+            yield book
 
-    async def get_book(self, book_id: str, db_session: AsyncSession):
-        statement = select(Book).where(Book.uid == book_id)
+    async def get_book(
+        self, book_id: str, db_session: AsyncSession, include: Sequence[str] = ()
+    ):
+        statement = (
+            select(Book)
+            .where(Book.uid == book_id)
+            .options(*include_options(Book, include))
+        )
         result = await db_session.execute(statement)
         result = result.scalars().first()
         return result
 
+    async def get_book_version(self, book_id: str, db_session: AsyncSession):
+        """updated_at of one book, or None if it does not exist."""
+        return await db_session.scalar(
+            select(Book.updated_at).where(Book.uid == book_id)
+        )
+
+    async def touch_books(self, book_uids, db_session: AsyncSession) -> None:
+        """Bump updated_at for changes that live outside the books row (tags)."""
+        if book_uids:
+            await db_session.execute(
+                update(Book)
+                .where(Book.uid.in_(book_uids))
+                .values(updated_at=datetime.now(timezone.utc))
+            )
+
     async def create_book(
         self, book: BookCreateModel, user_uid: str, db_session: AsyncSession
     ):
@@ -43,22 +233,162 @@ class BookService:
     async def update_book(
         self, book_id: str, book: BookUpdateModel, db_session: AsyncSession
     ):
-        existing_book = await self.get_a_book(book_id, db_session)
+        existing_book = await self.get_book(book_id, db_session)
         update_data_dict = book.model_dump()
         if existing_book is not None:
             for k, v in update_data_dict.items():
                 setattr(existing_book, k, v)
             await db_session.commit()
             await db_session.refresh(existing_book)
+            await invalidate_book_cache(existing_book.uid)
             return existing_book
         else:
             return None
 
     async def delete_book(self, book_id: str, db_session: AsyncSession):
-        existing_book = await self.get_a_book(book_id, db_session)
+        # Both collections must be loaded so the ORM can detach reviews and
+        # remove booktag rows without lazy loading.
+        existing_book = await self.get_book(
+            book_id, db_session, include=("reviews", "tags")
+        )
         if existing_book is not None:
             await db_session.delete(existing_book)
             await db_session.commit()
+            await invalidate_book_cache(existing_book.uid)
             return existing_book
         else:
             return None
+
+    async def import_books(
+        self,
+        rows: AsyncIterator[Tuple[int, dict | None, str | None]],
+        user_uid: str,
+        db_session: AsyncSession,
+    ) -> BookImportReport:
+        """Validate streamed rows in chunks and bulk-write them in one transaction.
+
+        Invalid rows are reported and skipped; valid rows are owned by the caller.
+        """
+        owner = uuid.UUID(str(user_uid))
+        imported, failed, errors = 0, 0, []
+        chunk: List[tuple] = []
+
+        async for row_number, record, parse_error in rows:
+            try:
+                if parse_error is not None:
+                    raise ValueError(parse_error)
+                book = BookCreateModel.model_validate(record)
+                published_date = datetime.strptime(
+                    book.published_date, "%Y-%m-%d"
+                ).date()
+            except ValidationError as e:
+                row_errors = [
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                    for err in e.errors()
+                ]
+            except ValueError as e:
+                row_errors = [str(e)]
+            else:
+                now = datetime.now(timezone.utc)
+                chunk.append(
+                    (
+                        uuid.uuid4(),
+                        book.title,
+                        book.author,
+                        book.publisher,
+                        published_date,
+                        book.page_count,
+                        book.language,
+                        owner,
+                        now,
+                        now,
+                    )
+                )
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    imported += await self._write_book_records(chunk, db_session)
+                    chunk = []
+                continue
+
+            failed += 1
+            if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                errors.append({"row": row_number, "errors": row_errors})
+
+        if chunk:
+            imported += await self._write_book_records(chunk, db_session)
+        await db_session.commit()
+        return BookImportReport(imported=imported, failed=failed, errors=errors)
+
+    async def _write_book_records(
+        self, records: List[tuple], db_session: AsyncSession
+    ) -> int:
+        """COPY records into books on asyncpg, multi-row INSERT otherwise."""
+        connection = await db_session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        if hasattr(driver_connection, "copy_records_to_table"):
+            # asyncpg only opens the session's transaction on the first
+            # statement; issue one so the COPY is part of it.
+            await connection.exec_driver_sql("SELECT 1")
+            await driver_connection.copy_records_to_table(
+                Book.__tablename__, records=records, columns=BOOK_IMPORT_COLUMNS
+            )
+        else:
+            await db_session.execute(
+                insert(Book.__table__),
+                [dict(zip(BOOK_IMPORT_COLUMNS, record)) for record in records],
+            )
+        return len(records)
+
+    async def record_review_rating(
+        self, book_uid, rating: float, db_session: AsyncSession, removed=False
+    ) -> None:
+        """Adjust a book's rating aggregates in the caller's transaction."""
+        sign = -1 if removed else 1
+        await db_session.execute(
+            update(Book)
+            .where(Book.uid == book_uid)
+            .values(
+                review_count=Book.review_count + sign,
+                rating_sum=Book.rating_sum + sign * rating,
+            )
+        )
+
+    async def recompute_rating_aggregates(self, db_session: AsyncSession) -> int:
+        """Rebuild review_count and rating_sum from reviews; returns books repaired."""
+        totals = (
+            select(
+                Review.book_uid,
+                func.count().label("review_count"),
+                func.sum(Review.rating).label("rating_sum"),
+            )
+            .group_by(Review.book_uid)
+            .subquery()
+        )
+        reviewed = await db_session.scalars(
+            update(Book)
+            .where(Book.uid == totals.c.book_uid)
+            .where(
+                (Book.review_count != totals.c.review_count)
+                | (
+                    func.abs(Book.rating_sum - totals.c.rating_sum)
+                    > RATING_SUM_TOLERANCE
+                )
+            )
+            .values(review_count=totals.c.review_count, rating_sum=totals.c.rating_sum)
+            .returning(Book.uid)
+        )
+        unreviewed = await db_session.scalars(
+            update(Book)
+            .where(
+                (Book.review_count != 0)
+                | (func.abs(Book.rating_sum) > RATING_SUM_TOLERANCE)
+            )
+            .where(~exists().where(Review.book_uid == Book.uid))
+            .values(review_count=0, rating_sum=0)
+            .returning(Book.uid)
+        )
+        repaired = [*reviewed.all(), *unreviewed.all()]
+        await db_session.commit()
+        await invalidate_book_caches(repaired)
+        return len(repaired)
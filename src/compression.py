@@ -0,0 +1,129 @@
+import gzip
+from typing import Optional
+
+import brotli
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import Config
+
+# Preferred first; brotli is smaller at a comparable CPU cost for JSON.
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Highest-q encoding the client accepts, or None for identity.
+
+    Codings listed with q=0 stay refused even when "*" would cover them, and
+    ties go to the earlier entry of ENCODINGS.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def accepted_encoding(request: Request) -> Optional[str]:
+    return choose_encoding(request.headers.get("accept-encoding", ""))
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.GZIP_LEVEL, mtime=0)
+
+
+def compressed_variants(body: bytes) -> dict:
+    """Every encoding of body, for cache entries; empty below the threshold."""
+    if len(body) < Config.COMPRESSION_MIN_SIZE:
+        return {}
+    return {encoding: compress(body, encoding) for encoding in ENCODINGS}
+
+
+def variant_response(entry: dict, encoding: Optional[str], headers: dict) -> Response:
+    """Serve a cache entry in the negotiated encoding without recompressing.
+
+    entry holds the identity "body" plus any precompressed variants.
+    """
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    if encoding in entry:
+        headers["Content-Encoding"] = encoding
+        content = entry[encoding]
+    else:
+        content = entry["body"]
+    return Response(content=content, headers=headers, media_type="application/json")
+
+
+class CompressionMiddleware:
+    """Compress single-body responses above COMPRESSION_MIN_SIZE.
+
+    Responses that already carry Content-Encoding (precompressed cache hits)
+    and streamed responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            compressible = "content-encoding" not in headers and headers.get(
+                "content-type", ""
+            ).startswith(COMPRESSIBLE_TYPES)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if (
+                compressible
+                and not message.get("more_body", False)
+                and len(body) >= Config.COMPRESSION_MIN_SIZE
+            ):
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                message = {"type": "http.response.body", "body": body}
+
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
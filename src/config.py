@@ -1,3 +1,4 @@
+from typing import List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +10,35 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DATABASE_REPLICA_URLS: List[str] = []
+    READ_YOUR_WRITES_SECONDS: int = 5
+    BOOK_CACHE_TTL_SECONDS: int = 300
+    TOKEN_CACHE_SIZE: int = 4096
+    USER_PRINCIPAL_TTL_SECONDS: int = 30
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    TAG_INDEX_REFRESH_SECONDS: int = 60
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_SECONDS: float = 1.0
+    ACCESS_LOG_QUEUE_SIZE: int = 10000
+    QUERY_REPEAT_WARN_THRESHOLD: int = 10
+    CACHE_CONTROL_BOOK_DETAIL: str = "private, no-cache"
+    CACHE_CONTROL_BOOK_LIST: str = "private, no-cache"
+    CACHE_CONTROL_TAG_LIST: str = "private, no-cache"
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 5
+    BROTLI_QUALITY: int = 4
+    RATE_LIMIT_LOGIN_IP: str = "20/60"
+    RATE_LIMIT_LOGIN_EMAIL: str = "5/60"
+    RATE_LIMIT_SIGNUP: str = "10/3600"
+    RATE_LIMIT_REVIEW_CREATE: str = "30/60"
+    RATE_LIMIT_BOOK_CREATE: str = "60/60"
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from fastapi import Query
+from pydantic import BaseModel, create_model
+
+from src.errors import InvalidFields
+
+
+class FieldsParam:
+    """Parse ?fields=a,b into the requested subset of a response model's fields."""
+
+    def __init__(self, model: type[BaseModel]):
+        self.model = model
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None, description="Comma-separated fields to return"
+        ),
+    ) -> Tuple[str, ...]:
+        if not fields:
+            return ()
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        if not names.issubset(self.model.model_fields):
+            raise InvalidFields()
+        return tuple(name for name in self.model.model_fields if name in names)
+
+
+@lru_cache
+def sparse_model(model: type[BaseModel], fields: Tuple[str, ...]) -> type[BaseModel]:
+    """Response model holding only the given fields of model."""
+    return create_model(
+        f"{model.__name__}_{'_'.join(fields)}",
+        **{name: (model.model_fields[name].annotation, ...) for name in fields},
+    )
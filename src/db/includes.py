@@ -0,0 +1,31 @@
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Query
+from sqlalchemy.orm import selectinload
+
+from src.errors import InvalidInclude
+
+
+class IncludeParam:
+    """Parse ?include=a,b into a sorted tuple of allowed relationship names."""
+
+    def __init__(self, *allowed: str):
+        self.allowed = allowed
+
+    def __call__(
+        self,
+        include: Optional[str] = Query(
+            None, description="Comma-separated relationships to embed"
+        ),
+    ) -> Tuple[str, ...]:
+        if not include:
+            return ()
+        names = {name.strip() for name in include.split(",") if name.strip()}
+        if not names.issubset(self.allowed):
+            raise InvalidInclude()
+        return tuple(sorted(names))
+
+
+def include_options(model, include: Iterable[str]) -> list:
+    """selectinload options for the requested relationships of a model."""
+    return [selectinload(getattr(model, name)) for name in include]
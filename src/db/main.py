@@ -1,9 +1,124 @@
+import itertools
+import os
+import time
+from fastapi import Request
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from typing import AsyncGenerator
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Optional
 from sqlmodel import SQLModel
 from src.config import Config
+from src.db.query_stats import track_queries
+from src.db.redis import (
+    is_user_pinned_to_primary,
+    pin_user_to_primary,
+    publish_principal_invalidations,
+)
+from src.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT,
+)
 
-async_engine = create_async_engine(url=Config.DATABASE_URL, echo=Config.DEBUG)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            DB_POOL_WAIT.observe(waited)
+
+
+def _count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _count_checkin(dbapi_connection, connection_record) -> None:
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def build_engine(url: str):
+    engine = create_async_engine(
+        url=url,
+        echo=Config.DEBUG,
+        poolclass=InstrumentedQueuePool,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_pre_ping=Config.DB_POOL_PRE_PING,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        connect_args={"statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE},
+    )
+    event.listen(engine.sync_engine, "checkout", _count_checkout)
+    event.listen(engine.sync_engine, "checkin", _count_checkin)
+    track_queries(engine)
+    DB_POOL_SIZE.inc(Config.DB_POOL_SIZE)
+    return engine
+
+
+# session.info key: uids of users whose cached principal a flush made stale.
+INVALIDATED_PRINCIPALS = "invalidated_principals"
+
+
+class PrimarySession(AsyncSession):
+    """Primary session that pins the committing user's reads to the primary.
+
+    The pin is set as part of commit(), so it is in Redis before the handler
+    returns and the client can't read a lagging replica with its next request.
+    Principals invalidated by the transaction are published to other workers
+    at the same point.
+    """
+
+    async def commit(self) -> None:
+        await super().commit()
+        invalidated = self.info.pop(INVALIDATED_PRINCIPALS, None)
+        if invalidated:
+            await publish_principal_invalidations(invalidated)
+        request = self.info.get("request")
+        user_uid = _request_user_uid(request) if request is not None else None
+        if replica_engines and user_uid:
+            await pin_user_to_primary(user_uid)
+
+
+async_engine = build_engine(Config.DATABASE_URL)
+
+async_session_maker = async_sessionmaker(
+    bind=async_engine, class_=PrimarySession, expire_on_commit=False
+)
+
+replica_engines = [build_engine(url) for url in Config.DATABASE_REPLICA_URLS]
+replica_session_makers = [
+    async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    for engine in replica_engines
+]
+_replica_rotation = itertools.cycle(replica_session_makers)
+
+
+def _request_user_uid(request: Request) -> Optional[str]:
+    token_data = getattr(request.state, "token_data", None)
+    if not token_data:
+        return None
+    return token_data["user"]["user_uid"]
 
 
 async def init_db():
@@ -11,10 +126,59 @@ async def init_db():
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async_session = async_sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session on the primary; a commit pins the user's reads to the primary."""
+    async with async_session_maker() as session:
+        # The token is decoded by a later dependency, so the user is looked
+        # up from the request at commit time.
+        session.info["request"] = request
+        yield session
 
-    async with async_session() as session:
+
+async def _open_replica_session() -> Optional[AsyncSession]:
+    for _ in range(len(replica_session_makers)):
+        session = next(_replica_rotation)()
+        try:
+            await session.connection()
+            return session
+        except (OSError, SQLAlchemyError):
+            await session.close()
+    return None
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only handlers.
+
+    Round-robins across the configured replicas and falls back to the primary
+    when there are none, none are reachable, or the user has just written.
+    """
+    session = None
+    if replica_engines:
+        user_uid = _request_user_uid(request)
+        if not user_uid or not await is_user_pinned_to_primary(user_uid):
+            session = await _open_replica_session()
+
+    if session is None:
+        session = async_session_maker()
+
+    async with session:
         yield session
+
+
+def get_pool_stats(engine=async_engine) -> dict:
+    """Snapshot of the engine's connection pool for this worker process."""
+    pool = engine.pool
+    return {
+        "pid": os.getpid(),
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "checkouts": pool.checkouts,
+        "timeouts": pool.timeouts,
+        "avg_wait_seconds": (
+            pool.total_wait / pool.checkouts if pool.checkouts else 0.0
+        ),
+        "max_wait_seconds": pool.max_wait,
+    }
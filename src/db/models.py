@@ -1,8 +1,9 @@
 import uuid
 from typing import List, Optional
-from sqlmodel import Column, Relationship, SQLModel, Field
+from sqlmodel import Column, Index, Relationship, SQLModel, Field, UniqueConstraint
 from datetime import datetime, timezone, date
 import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import Computed
 
 
 class User(SQLModel, table=True):
@@ -43,12 +44,8 @@ class User(SQLModel, table=True):
             onupdate=lambda: datetime.now(timezone.utc),
         )
     )
-    books: List["Book"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"lazy": "selectin"}
-    )
-    reviews: List["Review"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"lazy": "selectin"}
-    )
+    books: List["Book"] = Relationship(back_populates="user")
+    reviews: List["Review"] = Relationship(back_populates="user")
 
     def __repr__(self):
         return f"<User {self.username}>"
@@ -61,16 +58,16 @@ class BookTag(SQLModel, table=True):
 
 class Tag(SQLModel, table=True):
     __tablename__ = "tags"
+    __table_args__ = (UniqueConstraint("name", name="uq_tags_name"),)
     uid: uuid.UUID = Field(
         sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
     )
     name: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
     created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    books: List["Book"] = Relationship(
-        link_model=BookTag,
-        back_populates="tags",
-        sa_relationship_kwargs={"lazy": "selectin"},
+    updated_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now)
     )
+    books: List["Book"] = Relationship(link_model=BookTag, back_populates="tags")
 
     def __repr__(self) -> str:
         return f"<Tag {self.name}>"
@@ -78,6 +75,11 @@ class Tag(SQLModel, table=True):
 
 class Book(SQLModel, table=True):
     __tablename__ = "books"
+    __table_args__ = (
+        Index("ix_books_created_at_uid", "created_at", "uid"),
+        Index("ix_books_user_uid_created_at_uid", "user_uid", "created_at", "uid"),
+        Index("ix_books_avg_rating_uid", "avg_rating", "uid"),
+    )
 
     uid: uuid.UUID = Field(
         sa_column=Column(
@@ -99,6 +101,24 @@ class Book(SQLModel, table=True):
         default=None,
         foreign_key="users.uid",
     )
+    review_count: int = Field(
+        sa_column=Column(pg.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    rating_sum: float = Field(
+        sa_column=Column(
+            pg.DOUBLE_PRECISION, nullable=False, default=0, server_default="0"
+        )
+    )
+    avg_rating: float = Field(
+        sa_column=Column(
+            pg.DOUBLE_PRECISION,
+            Computed(
+                "CASE WHEN review_count > 0 THEN rating_sum / review_count ELSE 0 END",
+                persisted=True,
+            ),
+            nullable=False,
+        )
+    )
 
     created_at: datetime = Field(
         sa_column=Column(
@@ -117,21 +137,37 @@ class Book(SQLModel, table=True):
         )
     )
     user: Optional["User"] = Relationship(back_populates="books")
-    reviews: List["Review"] = Relationship(
-        back_populates="book", sa_relationship_kwargs={"lazy": "selectin"}
-    )
-    tags: List[Tag] = Relationship(
-        link_model=BookTag,
-        back_populates="books",
-        sa_relationship_kwargs={"lazy": "selectin"},
-    )
+    reviews: List["Review"] = Relationship(back_populates="book")
+    tags: List[Tag] = Relationship(link_model=BookTag, back_populates="books")
 
     def __repr__(self):
         return f"<Book(title={self.title}, author={self.author})>"
 
 
+# Maintained by Postgres and only used in WHERE/ORDER BY, so it is added to
+# the table but not the mapper: loading a Book never fetches it.
+Book.__table__.append_column(
+    Column(
+        "search_vector",
+        pg.TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(author, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(publisher, '')), 'C')",
+            persisted=True,
+        ),
+    )
+)
+Index(
+    "ix_books_search_vector",
+    Book.__table__.c.search_vector,
+    postgresql_using="gin",
+)
+
+
 class Review(SQLModel, table=True):
     __tablename__ = "reviews"
+    __table_args__ = (Index("ix_reviews_created_at_uid", "created_at", "uid"),)
 
     uid: uuid.UUID = Field(
         sa_column=Column(
@@ -172,3 +208,11 @@ class Review(SQLModel, table=True):
 
     def __repr__(self):
         return f"<Review(review_txt={self.review_txt}, rating={self.rating} by user {self.user_uid} for book {self.book_uid})>"
+
+
+Index(
+    "ix_reviews_book_uid_created_at_uid",
+    Review.__table__.c.book_uid,
+    Review.__table__.c.created_at.desc(),
+    Review.__table__.c.uid.desc(),
+)
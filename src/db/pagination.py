@@ -0,0 +1,99 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlmodel import desc
+
+from src.errors import InvalidCursor
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _encode(position: list) -> str:
+    raw = json.dumps(position).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_cursor(created_at: datetime, uid: uuid.UUID) -> str:
+    """Encode the (created_at, uid) keyset position into an opaque cursor."""
+    return _encode([created_at.isoformat(), str(uid)])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode an opaque cursor back into its (created_at, uid) position."""
+    try:
+        created_at, uid = _decode(cursor)
+        return datetime.fromisoformat(created_at), uuid.UUID(uid)
+    except (ValueError, TypeError, AttributeError):
+        raise InvalidCursor()
+
+
+def encode_rank_cursor(rank: float, uid: uuid.UUID) -> str:
+    """Encode a (rank, uid) keyset position for relevance-ordered results."""
+    return _encode([rank, str(uid)])
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    try:
+        rank, uid = _decode(cursor)
+        return float(rank), uuid.UUID(uid)
+    except (ValueError, TypeError, AttributeError):
+        raise InvalidCursor()
+
+
+def paginate(
+    statement, created_at_column, uid_column, limit: int, cursor: Optional[str]
+):
+    """Apply newest-first keyset pagination on (created_at, uid) to a select.
+
+    One extra row is fetched so the caller can tell whether a next page exists.
+    """
+    if cursor:
+        created_at, uid = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(created_at_column, uid_column) < tuple_(created_at, uid)
+        )
+    return statement.order_by(desc(created_at_column), desc(uid_column)).limit(
+        limit + 1
+    )
+
+
+def split_page(rows: Sequence, limit: int) -> Tuple[Sequence, Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.uid)
+
+
+def paginate_by_rank(
+    statement, rank_column, uid_column, limit: int, cursor: Optional[str]
+):
+    """Apply highest-first keyset pagination on (rank, uid) to a select."""
+    if cursor:
+        rank, uid = decode_rank_cursor(cursor)
+        statement = statement.where(
+            tuple_(rank_column, uid_column) < tuple_(rank, uid)
+        )
+    return statement.order_by(desc(rank_column), desc(uid_column)).limit(limit + 1)
+
+
+def split_rank_page(
+    rows: Sequence, limit: int, rank_attr: str
+) -> Tuple[Sequence, Optional[str]]:
+    """split_page for (rank, uid) pages; rank_attr names the rank on each row."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_rank_cursor(getattr(last, rank_attr), last.uid)
@@ -0,0 +1,59 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+
+
+class QueryStats:
+    """Statements issued and database time spent while serving one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes issued more than threshold times (likely N+1)."""
+        return [(sql, n) for sql, n in self.shapes.items() if n > threshold]
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f"db;dur={self.duration * 1000:.3f}, "
+            f"db-count;desc={self.count}, "
+            f"app;dur={total * 1000:.3f}"
+        )
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def start_query_stats() -> QueryStats:
+    """Begin accounting for the current request; child tasks share the result."""
+    stats = QueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - conn.info.pop("query_start"))
+
+
+def track_queries(engine) -> None:
+    """Count the engine's statements into the current request's QueryStats."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,18 +1,264 @@
+import asyncio
+import logging
+import math
+import time
+import uuid
+from typing import Callable, Iterable, Optional
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 from src.config import Config
+from src.metrics import REDIS_LATENCY
 
-token_blocklist = Redis(
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedRedis(Redis):
+    """Redis client that records the round-trip time of each command."""
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_LATENCY.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - start
+            )
+
+
+token_blocklist = InstrumentedRedis(
     host=Config.REDIS_HOST,
     port=Config.REDIS_PORT,
     db=0,
 )
 JTI_EXPIRATION_SECONDS = 3600  # 1 hour
+BLOCKLIST_CHANNEL = "token_blocklist"
+BLOCKLIST_PREFIX = "revoked:"
+# Revocations used to be stored under the bare jti. Those keys live at most
+# JTI_EXPIRATION_SECONDS, so they are still read until that long after the
+# first start with prefixed keys; this key holds that deadline (epoch seconds).
+LEGACY_BLOCKLIST_UNTIL_KEY = "blocklist:legacy_until"
+# Principal invalidations share the channel, tagged so they aren't taken for a
+# jti. A worker that predates the tag adds them as a jti no token carries.
+PRINCIPAL_INVALIDATION_PREFIX = "principal:"
+
+
+def blocklist_key(jti: str) -> str:
+    return f"{BLOCKLIST_PREFIX}{jti}"
+
+
+class RevocationCache:
+    """In-process copy of the Redis blocklist, kept current via pub/sub.
+
+    Lookups only trust the local set while the subscription is live; otherwise
+    they fall back to asking Redis directly.
+    """
+
+    def __init__(self):
+        self.revoked: dict[str, float] = {}
+        self.subscribed = False
+        # Until Redis says otherwise, assume bare-jti keys may still exist.
+        self.legacy_until = math.inf
+        # Called with the user uid of every principal invalidation received.
+        self.on_principal_invalidated: Callable[[str], None] = lambda user_uid: None
+
+    @property
+    def legacy_keys_live(self) -> bool:
+        return time.time() < self.legacy_until
+
+    def add(self, jti: str, ttl: float = JTI_EXPIRATION_SECONDS) -> None:
+        self.revoked[jti] = time.monotonic() + ttl
+
+    def contains(self, jti: str) -> bool:
+        expires_at = self.revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self.revoked[jti]
+            return False
+        return True
+
+    def prune(self) -> None:
+        now = time.monotonic()
+        for jti in [jti for jti, exp in self.revoked.items() if exp <= now]:
+            del self.revoked[jti]
+
+    async def load_legacy_deadline(self) -> None:
+        await token_blocklist.set(
+            LEGACY_BLOCKLIST_UNTIL_KEY, time.time() + JTI_EXPIRATION_SECONDS, nx=True
+        )
+        self.legacy_until = float(await token_blocklist.get(LEGACY_BLOCKLIST_UNTIL_KEY))
+
+    async def warm(self) -> None:
+        """Load every jti currently in the Redis blocklist."""
+        await self.load_legacy_deadline()
+        keys = [
+            key
+            async for key in token_blocklist.scan_iter(
+                match=f"{BLOCKLIST_PREFIX}*", count=1000
+            )
+        ]
+        if self.legacy_keys_live:
+            keys += [
+                key
+                async for key in token_blocklist.scan_iter(
+                    match="*-*-*-*-*", count=1000
+                )
+                if b":" not in key
+            ]
+        if not keys:
+            return
+        async with token_blocklist.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.ttl(key)
+            ttls = await pipe.execute()
+        for key, ttl in zip(keys, ttls):
+            if ttl and ttl > 0:
+                self.add(key.decode().removeprefix(BLOCKLIST_PREFIX), ttl)
+
+    def handle(self, data: str) -> None:
+        if data.startswith(PRINCIPAL_INVALIDATION_PREFIX):
+            self.on_principal_invalidated(
+                data.removeprefix(PRINCIPAL_INVALIDATION_PREFIX)
+            )
+            return
+        self.add(data)
+        self.prune()
+
+    async def listen(self, retry_seconds: float = 1.0) -> None:
+        """Follow revocations published by any worker until cancelled."""
+        while True:
+            pubsub = token_blocklist.pubsub()
+            try:
+                await pubsub.subscribe(BLOCKLIST_CHANNEL)
+                # Warm after subscribing so nothing published in between is lost.
+                await self.warm()
+                self.subscribed = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.handle(message["data"].decode())
+            except (RedisError, OSError) as e:
+                logger.warning(f"Blocklist subscription lost: {e}")
+            finally:
+                self.subscribed = False
+                await pubsub.aclose()
+            await asyncio.sleep(retry_seconds)
+
+
+revocation_cache = RevocationCache()
 
 
 async def add_jti_to_blocklist(jti: str) -> None:
-    await token_blocklist.set(name=jti, value="true", ex=JTI_EXPIRATION_SECONDS)
+    await token_blocklist.set(
+        name=blocklist_key(jti), value="true", ex=JTI_EXPIRATION_SECONDS
+    )
+    revocation_cache.add(jti)
+    await token_blocklist.publish(BLOCKLIST_CHANNEL, jti)
 
 
 async def is_token_in_blocklist(jti: str) -> bool:
-    jti = await token_blocklist.get(jti)
-    return jti is not None
+    if revocation_cache.contains(jti):
+        return True
+    if revocation_cache.subscribed:
+        return False
+    keys = [blocklist_key(jti)]
+    if revocation_cache.legacy_keys_live:
+        keys.append(jti)
+    return await token_blocklist.exists(*keys) > 0
+
+
+async def publish_principal_invalidations(user_uids: Iterable[str]) -> None:
+    """Tell every worker to drop its cached principal for these users."""
+    for user_uid in user_uids:
+        await token_blocklist.publish(
+            BLOCKLIST_CHANNEL, f"{PRINCIPAL_INVALIDATION_PREFIX}{user_uid}"
+        )
+
+
+async def pin_user_to_primary(user_uid: str) -> None:
+    """Route this user's reads to the primary until replicas catch up."""
+    await token_blocklist.set(
+        name=f"primary_pin:{user_uid}",
+        value="true",
+        ex=Config.READ_YOUR_WRITES_SECONDS,
+    )
+
+
+async def is_user_pinned_to_primary(user_uid: str) -> bool:
+    pinned = await token_blocklist.get(f"primary_pin:{user_uid}")
+    return pinned is not None
+
+
+def book_cache_key(book_uid) -> str:
+    # v2 entries are hashes (body, etag); the prefix keeps old string entries
+    # from being read as hashes until they expire.
+    return f"book_detail:v2:{uuid.UUID(str(book_uid))}"
+
+
+def book_generation_key(book_uid) -> str:
+    return f"book_detail_gen:{uuid.UUID(str(book_uid))}"
+
+
+async def get_cached_book(book_uid) -> Optional[dict]:
+    """The cached detail entry: JSON "body", its "etag" and any compressed
+    variants keyed by content coding."""
+    entry = await token_blocklist.hgetall(book_cache_key(book_uid))
+    if not entry:
+        return None
+    entry = {key.decode(): value for key, value in entry.items()}
+    entry["etag"] = entry["etag"].decode()
+    return entry
+
+
+async def get_book_generation(book_uid) -> str:
+    """Invalidation count of a book's entry; read it before loading the row
+    the entry will be built from, and pass it to cache_book."""
+    generation = await token_blocklist.get(book_generation_key(book_uid))
+    return generation.decode() if generation else "0"
+
+
+# Every invalidation bumps the book's generation. A fill whose row was read
+# before the latest invalidation carries an older generation and is dropped,
+# so it can't put back the version the write just replaced.
+CACHE_BOOK_SCRIPT = """
+local generation = redis.call('GET', KEYS[2]) or '0'
+if generation ~= ARGV[2] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+_cache_book = token_blocklist.register_script(CACHE_BOOK_SCRIPT)
+
+
+async def cache_book(
+    book_uid, payload: bytes, etag: str, variants: dict, generation: str
+) -> None:
+    """Store a detail entry unless the book was invalidated since generation."""
+    fields = {"body": payload, "etag": etag, **variants}
+    await _cache_book(
+        keys=[book_cache_key(book_uid), book_generation_key(book_uid)],
+        args=[
+            Config.BOOK_CACHE_TTL_SECONDS,
+            generation,
+            *(item for field in fields.items() for item in field),
+        ],
+    )
+
+
+async def invalidate_book_cache(book_uid) -> None:
+    await invalidate_book_caches([book_uid])
+
+
+async def invalidate_book_caches(book_uids) -> None:
+    if not book_uids:
+        return
+    async with token_blocklist.pipeline(transaction=True) as pipe:
+        for book_uid in book_uids:
+            generation_key = book_generation_key(book_uid)
+            pipe.incr(generation_key)
+            # Only fills in flight need the old value, and none take this long.
+            pipe.expire(generation_key, Config.BOOK_CACHE_TTL_SECONDS)
+            pipe.delete(book_cache_key(book_uid))
+        await pipe.execute()
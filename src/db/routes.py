@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+
+from src.auth.dependencies import RoleChecker
+
+from .main import get_pool_stats
+
+db_router = APIRouter()
+admin_role_checker = Depends(RoleChecker(["admin"]))
+
+
+@db_router.get("/pool", dependencies=[admin_role_checker])
+async def get_pool_statistics() -> dict:
+    """Connection pool usage for the worker that serves this request."""
+    return get_pool_stats()
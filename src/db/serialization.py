@@ -0,0 +1,43 @@
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from fastapi import Response, status
+from pydantic import BaseModel, TypeAdapter, create_model
+
+
+@lru_cache
+def json_adapter(tp: Any) -> TypeAdapter:
+    """Precompiled validator/serializer for tp, built once per type."""
+    return TypeAdapter(tp)
+
+
+@lru_cache
+def page_model(item: type[BaseModel]) -> type[BaseModel]:
+    """Cursor page of item, mirroring the hand-written page models."""
+    return create_model(
+        f"{item.__name__}_page",
+        items=(List[item], ...),
+        next_cursor=(Optional[str], None),
+    )
+
+
+def json_response(
+    tp: Any,
+    content: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[dict] = None,
+) -> Response:
+    """Serialize trusted database output straight to JSON bytes.
+
+    Rows are read once through the cached adapter (from_attributes) and
+    dumped by pydantic-core; returning a Response skips FastAPI's second
+    validation pass against the route's response_model.
+    """
+    adapter = json_adapter(tp)
+    value = adapter.validate_python(content, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(value),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -75,6 +75,32 @@ class UserNotFound(BooklyException):
     pass
 
 
+class InvalidCursor(BooklyException):
+    """User has provided a malformed pagination cursor"""
+
+    pass
+
+
+class InvalidInclude(BooklyException):
+    """User has asked to include a relationship that cannot be embedded"""
+
+    pass
+
+
+class InvalidFields(BooklyException):
+    """User has asked for a field the resource does not have"""
+
+    pass
+
+
+class RateLimitExceeded(BooklyException):
+    """User has sent too many requests to a rate-limited route"""
+
+    def __init__(self, headers: dict):
+        super().__init__()
+        self.headers = headers
+
+
 def create_exception_handler(
     status_code: int, initial_detail: Any
 ) -> Callable[[Request, Exception], JSONResponse]:
@@ -210,6 +236,52 @@ def register_error_handlers(app: FastAPI):
         ),
     )
 
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Pagination cursor is invalid",
+                "resolution": "Use the next_cursor returned by the previous page",
+                "error_code": "invalid_cursor",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidInclude,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Unknown relationship in include",
+                "error_code": "invalid_include",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidFields,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Unknown field in fields",
+                "error_code": "invalid_fields",
+            },
+        ),
+    )
+
+    @app.exception_handler(RateLimitExceeded)
+    async def rate_limit_exceeded(request: Request, exc: RateLimitExceeded):
+        return JSONResponse(
+            content={
+                "message": "Too many requests",
+                "resolution": "Retry after the number of seconds in Retry-After",
+                "error_code": "rate_limited",
+            },
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers=exc.headers,
+        )
+
     @app.exception_handler(500)
     async def internal_server_error(request, exc):
         return JSONResponse(
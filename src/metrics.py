@@ -0,0 +1,141 @@
+import os
+from weakref import WeakKeyDictionary
+
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+try:
+    from fastapi.routing import iter_route_contexts
+except ImportError:  # before 0.143, app.routes already holds prefixed routes
+    iter_route_contexts = None
+
+# With PROMETHEUS_MULTIPROC_DIR set (one directory shared by all uvicorn
+# workers, emptied before start-up) every worker writes its samples to
+# mmap'd files and /metrics aggregates them; otherwise values live in memory.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template.",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "Requests by route template and status code.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured connection pool size.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT.",
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Password hash/verify jobs submitted and not yet finished.",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_QUEUED = Gauge(
+    "password_hash_queued",
+    "Password jobs waiting for a free executor worker.",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_JOBS = Counter(
+    "password_hash_jobs_total",
+    "Finished password jobs by outcome (ok or error).",
+    ["outcome"],
+)
+ACCESS_LOG_DROPPED = Counter(
+    "access_log_dropped_total",
+    "Access log records dropped because the log queue was full.",
+)
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round-trip latency by command.",
+    ["command"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+_route_paths: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def _full_route_paths(routes) -> dict:
+    """Full path template of every route in an app's table, keyed by route id.
+
+    Routes compare by value and aren't hashable; they live as long as the app.
+    """
+    if iter_route_contexts is None:
+        return {
+            id(route): route.path_format
+            for route in routes
+            if hasattr(route, "path_format")
+        }
+    return {
+        id(context.original_route): context.path_format
+        for context in iter_route_contexts(routes)
+        if context.path_format is not None
+    }
+
+
+def route_template(scope: dict) -> str:
+    """Full path template of the matched route, so /books/{book_id} is one series.
+
+    The matched route's own path_format is relative to its router on newer
+    FastAPI, so the prefixed template comes from the app's route table.
+    """
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    app = scope["app"]
+    paths = _route_paths.get(app)
+    if paths is None:
+        paths = _route_paths[app] = _full_route_paths(app.routes)
+    path = paths.get(id(route), route.path_format)
+    return scope.get("root_path", "") + path
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the multiprocess aggregate."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,36 +1,144 @@
+from typing import Sequence
 from fastapi import FastAPI
-from fastapi.requests import Request
 import time
 import logging
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from src.access_log import log_request
+from src.compression import CompressionMiddleware
+from src.config import Config
+from src.db.query_stats import QueryStats, start_query_stats
+from src.metrics import (
+    REQUEST_LATENCY,
+    REQUESTS,
+    REQUESTS_IN_FLIGHT,
+    route_template,
+)
 
 logger = logging.getLogger("uvicorn.access")
 logger.disabled = True
 
+query_logger = logging.getLogger("bookly.queries")
 
-def register_middleware(app: FastAPI):
-    @app.middleware("http")
-    async def custom_logging(request: Request, call_next):
-        start_time = time.time()
 
-        response = await call_next(request)
-        processing_time = time.time() - start_time
+def warn_repeated_queries(method: str, path: str, query_stats: QueryStats) -> None:
+    """Flag statement shapes repeated within one request, the mark of N+1."""
+    for statement, count in query_stats.repeated(Config.QUERY_REPEAT_WARN_THRESHOLD):
+        query_logger.warning(
+            f"{method} {path} ran the same statement "
+            f"{count} times: {statement[:200]}"
+        )
+
+
+class RequestTimingMiddleware:
+    """Times each HTTP request and records metrics, the access log and SQL stats.
+
+    Pure ASGI: the response passes straight through, with only the start
+    message touched to add Server-Timing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        query_stats = start_query_stats()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    query_stats.server_timing(time.perf_counter() - start_time),
+                )
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            record_request(
+                scope, status_code, time.perf_counter() - start_time, query_stats
+            )
+
+
+def record_request(
+    scope: Scope, status_code: int, duration: float, query_stats: QueryStats
+) -> None:
+    method = scope["method"]
+    route = route_template(scope)
+    REQUEST_LATENCY.labels(method, route).observe(duration)
+    REQUESTS.labels(method, route, status_code).inc()
+    client = scope.get("client")
+    log_request(
+        method,
+        scope["path"],
+        status_code,
+        duration,
+        f"{client[0]}:{client[1]}" if client else None,
+        db_queries=query_stats.count,
+        db_ms=round(query_stats.duration * 1000, 3),
+    )
+    if Config.DEBUG:
+        warn_repeated_queries(method, scope["path"], query_stats)
+
+
+class TrustedHostCORSMiddleware:
+    """Host check and CORS with a fast path for the common request.
+
+    Requests whose Host header exactly matches an allowed host skip
+    TrustedHostMiddleware, and those without an Origin header skip
+    CORSMiddleware too. Everything else (wildcards, www redirects, bad
+    hosts, preflights) goes through the Starlette middlewares unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, allowed_hosts: Sequence[str], **cors_options):
+        self.app = app
+        self.cors = CORSMiddleware(app, **cors_options)
+        self.checked = TrustedHostMiddleware(self.cors, allowed_hosts=allowed_hosts)
+        self.exact_hosts = frozenset(
+            host.lower().encode() for host in allowed_hosts if "*" not in host
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.checked(scope, receive, send)
+            return
+
+        host = origin = None
+        for name, value in scope["headers"]:
+            if name == b"host":
+                host = value
+            elif name == b"origin":
+                origin = value
 
-        message = f"{request.client.host}:{request.client.port} - {request.method} - {request.url.path} - {response.status_code} completed after {processing_time}s"
+        if host is not None and host.count(b":") == 1:
+            host = host.split(b":", 1)[0]
+        if host not in self.exact_hosts:
+            await self.checked(scope, receive, send)
+        elif origin is not None:
+            await self.cors(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
 
-        print(message)
-        return response
 
+def register_middleware(app: FastAPI):
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(RequestTimingMiddleware)
     app.add_middleware(
-        CORSMiddleware,
+        TrustedHostCORSMiddleware,
+        allowed_hosts=["localhost", "127.0.0.1"],
         allow_origins=["*"],
         allow_methods=["*"],
         allow_headers=["*"],
         allow_credentials=True,
     )
-
-    app.add_middleware(
-        TrustedHostMiddleware,
-        allowed_hosts=["localhost", "127.0.0.1"],
-    )
@@ -0,0 +1,131 @@
+import logging
+import math
+import time
+from typing import Callable, Tuple
+
+from fastapi import Request, Response
+from redis.exceptions import RedisError
+
+from src.db.redis import token_blocklist
+from src.errors import RateLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+# Refill by elapsed time, then take one token if available. Runs atomically in
+# Redis and uses the server clock, so workers never race or disagree on time.
+# Tokens come back as a string because Redis truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+_token_bucket = token_blocklist.register_script(TOKEN_BUCKET_SCRIPT)
+
+MAX_LOCAL_BUCKETS = 10000
+REDIS_RETRY_SECONDS = 5.0
+
+
+def parse_limit(limit: str) -> Tuple[int, float]:
+    """Parse "capacity/seconds": "10/60" is a burst of 10 refilled over a minute."""
+    capacity, period = limit.split("/")
+    return int(capacity), float(period)
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def user_uid(request: Request) -> str:
+    """uid from the token the route's bearer already decoded, else the IP."""
+    token_data = getattr(request.state, "token_data", None)
+    if not token_data:
+        return client_ip(request)
+    return token_data["user"]["user_uid"]
+
+
+class RateLimiter:
+    """Token-bucket limit for one route, shared by all workers through Redis.
+
+    Used as a dependency it keys on key(request); routes that key on request
+    data (such as the login email) call hit() themselves. While Redis is
+    unreachable each worker enforces the limit on its own, and Redis is not
+    retried for REDIS_RETRY_SECONDS so requests don't queue behind timeouts.
+    """
+
+    redis_retry_at = 0.0
+
+    def __init__(
+        self, name: str, limit: str, key: Callable[[Request], str] = client_ip
+    ):
+        self.name = name
+        self.capacity, self.period = parse_limit(limit)
+        self.rate = self.capacity / self.period
+        self.key = key
+        self.local: dict[str, Tuple[float, float]] = {}
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        await self.hit(self.key(request), response)
+
+    async def hit(self, identity: str, response: Response) -> None:
+        key = f"rate_limit:{self.name}:{identity}"
+        if time.monotonic() < RateLimiter.redis_retry_at:
+            allowed, tokens = self._take_local(key)
+        else:
+            try:
+                allowed, tokens = await _token_bucket(
+                    keys=[key], args=[self.capacity, self.rate]
+                )
+                tokens = float(tokens)
+            except (RedisError, OSError) as e:
+                logger.warning(f"Rate limiting locally for a while: {e}")
+                RateLimiter.redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+                allowed, tokens = self._take_local(key)
+
+        headers = self._headers(tokens)
+        if not allowed:
+            headers["Retry-After"] = str(math.ceil((1 - tokens) / self.rate))
+            raise RateLimitExceeded(headers)
+        response.headers.update(headers)
+
+    def _take_local(self, key: str) -> Tuple[bool, float]:
+        now = time.monotonic()
+        if len(self.local) >= MAX_LOCAL_BUCKETS:
+            self._prune_local(now)
+        if len(self.local) >= MAX_LOCAL_BUCKETS:
+            self.local.clear()
+        tokens, last = self.local.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last) * self.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.local[key] = (tokens, now)
+        return allowed, tokens
+
+    def _prune_local(self, now: float) -> None:
+        """Forget buckets that have refilled; they behave like new ones."""
+        self.local = {
+            key: (tokens, last)
+            for key, (tokens, last) in self.local.items()
+            if tokens + (now - last) * self.rate < self.capacity
+        }
+
+    def _headers(self, tokens: float) -> dict:
+        return {
+            "RateLimit-Limit": str(self.capacity),
+            "RateLimit-Remaining": str(max(0, math.floor(tokens))),
+            "RateLimit-Reset": str(math.ceil((self.capacity - tokens) / self.rate)),
+            "RateLimit-Policy": f"{self.capacity};w={self.period:g}",
+        }
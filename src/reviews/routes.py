@@ -1,41 +1,85 @@
-from fastapi import APIRouter, Depends, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.auth.dependencies import RoleChecker, get_current_user
-from src.db.main import get_session
-from src.db.models import User
+from src.db.main import get_read_session, get_session
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.db.serialization import json_response
+from src.auth.schemas import UserPrincipal
+from src.config import Config
+from src.rate_limit import RateLimiter, user_uid
 
-from .schemas import ReviewCreateModel
+from .schemas import ReviewCreateModel, ReviewModel, ReviewPageModel
 from .service import ReviewService
 
 review_service = ReviewService()
 review_router = APIRouter()
 admin_role_checker = Depends(RoleChecker(["admin"]))
 user_role_checker = Depends(RoleChecker(["user", "admin"]))
+review_limiter = RateLimiter("review_create", Config.RATE_LIMIT_REVIEW_CREATE, user_uid)
 
 
-@review_router.get("/", dependencies=[admin_role_checker])
-async def get_all_reviews(session: AsyncSession = Depends(get_session)):
-    books = await review_service.get_all_reviews(session)
+@review_router.get(
+    "/", response_model=ReviewPageModel, dependencies=[admin_role_checker]
+)
+async def get_all_reviews(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    reviews, next_cursor = await review_service.get_all_reviews(
+        session, limit, cursor
+    )
 
-    return books
+    return json_response(
+        ReviewPageModel, {"items": reviews, "next_cursor": next_cursor}
+    )
+
+
+@review_router.get(
+    "/book/{book_uid}",
+    response_model=ReviewPageModel,
+    dependencies=[user_role_checker],
+)
+async def get_book_reviews(
+    book_uid: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_read_session),
+):
+    reviews, next_cursor = await review_service.get_books_reviews(
+        book_uid, session, limit, cursor
+    )
+
+    return json_response(
+        ReviewPageModel, {"items": reviews, "next_cursor": next_cursor}
+    )
 
 
 @review_router.get("/{review_uid}", dependencies=[user_role_checker])
-async def get_review(review_uid: str, session: AsyncSession = Depends(get_session)):
+async def get_review(
+    review_uid: str, session: AsyncSession = Depends(get_read_session)
+):
     book = await review_service.get_review(review_uid, session)
 
     if not book:
         raise
 
 
-@review_router.post("/book/{book_uid}", dependencies=[user_role_checker])
+@review_router.post(
+    "/book/{book_uid}",
+    response_model=ReviewModel,
+    dependencies=[user_role_checker, Depends(review_limiter)],
+)
 async def add_review_to_books(
     book_uid: str,
     review_data: ReviewCreateModel,
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    current_user: UserPrincipal = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
-):
+) -> Response:
     new_review = await review_service.add_review_to_book(
         user_email=current_user.email,
         book_uid=book_uid,
@@ -43,7 +87,9 @@ async def add_review_to_books(
         session=session,
     )
 
-    return new_review
+    # Returning a Response drops the injected one, so carry the RateLimit-*
+    # headers the limiter set on it.
+    return json_response(ReviewModel, new_review, headers=dict(response.headers))
 
 
 @review_router.delete(
@@ -53,7 +99,7 @@ async def add_review_to_books(
 )
 async def delete_review(
     review_uid: str,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     await review_service.delete_review_to_from_book(
@@ -1,6 +1,6 @@
 from datetime import datetime
 import uuid
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -17,3 +17,8 @@ class ReviewModel(BaseModel):
 class ReviewCreateModel(BaseModel):
     rating: float = Field(lt=5)
     review_txt: Optional[str] = None
+
+
+class ReviewPageModel(BaseModel):
+    items: List[ReviewModel]
+    next_cursor: Optional[str] = None
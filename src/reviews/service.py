@@ -1,11 +1,13 @@
-from sqlmodel import desc, select
+from sqlmodel import select
 from fastapi.exceptions import HTTPException
 from fastapi import status
 from src.errors import BookNotFound, InsufficientPermission, UserNotFound
 from src.reviews.schemas import ReviewCreateModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.db.models import Review
-from typing import List
+from src.db.pagination import paginate, split_page
+from src.db.redis import invalidate_book_cache
+from typing import Optional
 from src.auth.service import UserService
 from src.books.service import BookService
 
@@ -26,7 +28,7 @@ class ReviewService:
             if not user:
                 raise UserNotFound()
 
-            book = await book_service.get_a_book(book_uid, session)
+            book = await book_service.get_book(book_uid, session)
             if not book:
                 raise BookNotFound()
 
@@ -34,41 +36,53 @@ class ReviewService:
             new_review = Review(
                 **review_data_dict, user_uid=user.uid, book_uid=book_uid
             )
-
-            new_review.user = user
-            new_review.book = book
             session.add(new_review)
+            await book_service.record_review_rating(
+                book.uid, new_review.rating, session
+            )
             await session.commit()
             await session.refresh(new_review)
+            await invalidate_book_cache(book.uid)
             return new_review
         except Exception as e:
             await session.rollback()
             raise e
 
     async def get_books_reviews(
-        self, book_uid: str, session: AsyncSession
-    ) -> List[Review]:
-        statement = (
-            select(Review)
-            .where(Review.book_uid == book_uid)
-            .order_by(desc(Review.created_at))
+        self,
+        book_uid: str,
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+    ):
+        """Return one page of a book's reviews, newest first, and the next-page cursor."""
+        statement = paginate(
+            select(Review).where(Review.book_uid == book_uid),
+            Review.created_at,
+            Review.uid,
+            limit,
+            cursor,
         )
         result = await session.execute(statement)
-        return result.scalars().all()
+        return split_page(result.scalars().all(), limit)
 
     async def get_review(self, review_uid: str, session: AsyncSession):
         statement = select(Review).where(Review.uid == review_uid)
 
         result = await session.execute(statement)
 
-        return result.first()
+        return result.scalars().first()
 
-    async def get_all_reviews(self, session: AsyncSession):
-        statement = select(Review).order_by(desc(Review.created_at))
+    async def get_all_reviews(
+        self, session: AsyncSession, limit: int, cursor: Optional[str] = None
+    ):
+        statement = paginate(
+            select(Review), Review.created_at, Review.uid, limit, cursor
+        )
 
         result = await session.execute(statement)
 
-        return result.all()
+        return split_page(result.scalars().all(), limit)
 
     async def delete_review_to_from_book(
         self, review_uid: str, user_email: str, session: AsyncSession
@@ -77,9 +91,17 @@ class ReviewService:
 
         review = await self.get_review(review_uid, session)
 
-        if not review or (review.user is not user):
+        if not review or not user or review.user_uid != user.uid:
             raise InsufficientPermission()
 
-        session.add(review)
+        await session.delete(review)
+
+        if review.book_uid is not None:
+            await book_service.record_review_rating(
+                review.book_uid, review.rating, session, removed=True
+            )
 
         await session.commit()
+
+        if review.book_uid is not None:
+            await invalidate_book_cache(review.book_uid)
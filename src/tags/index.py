@@ -0,0 +1,37 @@
+from bisect import bisect_left, insort
+from typing import Iterable, List
+
+
+class TagPrefixIndex:
+    """Sorted, case-insensitive list of tag names answering prefix lookups."""
+
+    def __init__(self):
+        self._entries: List[tuple[str, str]] = []
+
+    def load(self, names: Iterable[str]) -> None:
+        self._entries = sorted({(name.casefold(), name) for name in names})
+
+    def add(self, name: str) -> None:
+        entry = (name.casefold(), name)
+        position = bisect_left(self._entries, entry)
+        if position == len(self._entries) or self._entries[position] != entry:
+            insort(self._entries, entry)
+
+    def remove(self, name: str) -> None:
+        entry = (name.casefold(), name)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def suggest(self, prefix: str, limit: int) -> List[str]:
+        key = prefix.casefold()
+        position = bisect_left(self._entries, (key, ""))
+        matches = []
+        for folded, name in self._entries[position : position + limit]:
+            if not folded.startswith(key):
+                break
+            matches.append(name)
+        return matches
+
+
+tag_index = TagPrefixIndex()
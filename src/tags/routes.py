@@ -1,25 +1,59 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 
 from src.auth.dependencies import RoleChecker
 from src.books.schemas import Book
-from src.db.main import get_session
-
-from .schemas import TagAddModel, TagCreateModel, TagModel
-from .service import TagService
+from src.config import Config
+from src.db.etags import cache_headers, etag_matches, not_modified, weak_etag
+from src.db.fields import FieldsParam, sparse_model
+from src.db.serialization import json_response
+from src.db.main import get_read_session, get_session
+
+from .schemas import (
+    TagAddModel,
+    TagBulkAddModel,
+    TagBulkAddResult,
+    TagCreateModel,
+    TagModel,
+)
+from .service import TagService, tags_version
 
 tags_router = APIRouter()
 tag_service = TagService()
 user_role_checker = Depends(RoleChecker(["user", "admin"]))
+tag_fields = FieldsParam(TagModel)
 
 
 @tags_router.get("/", response_model=List[TagModel], dependencies=[user_role_checker])
-async def get_all_tags(session: AsyncSession = Depends(get_session)):
-    tags = await tag_service.get_tags(session)
-    return tags
+async def get_all_tags(
+    request: Request,
+    fields: tuple = Depends(tag_fields),
+    session: AsyncSession = Depends(get_read_session),
+):
+    if request.headers.get("if-none-match"):
+        version = await tag_service.get_tags_version(session)
+        headers = cache_headers(weak_etag(version), Config.CACHE_CONTROL_TAG_LIST)
+        if etag_matches(request, headers["ETag"]):
+            return not_modified(headers)
+
+    tags = await tag_service.get_tags(session, fields)
+    version = tags_version(tags)
+    headers = cache_headers(weak_etag(version), Config.CACHE_CONTROL_TAG_LIST)
+    item = sparse_model(TagModel, fields) if fields else TagModel
+    return json_response(List[item], tags, headers=headers)
+
+
+@tags_router.get(
+    "/suggest", response_model=List[str], dependencies=[user_role_checker]
+)
+async def suggest_tags(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+) -> List[str]:
+    return tag_service.suggest_tags(q, limit)
 
 
 @tags_router.post(
@@ -30,10 +64,10 @@ async def get_all_tags(session: AsyncSession = Depends(get_session)):
 )
 async def add_tag(
     tag_data: TagCreateModel, session: AsyncSession = Depends(get_session)
-) -> TagModel:
+) -> Response:
     tag_added = await tag_service.add_tag(tag_data=tag_data, session=session)
 
-    return tag_added
+    return json_response(TagModel, tag_added, status.HTTP_201_CREATED)
 
 
 @tags_router.post(
@@ -43,12 +77,24 @@ async def add_tags_to_book(
     book_uid: str,
     tag_data: TagAddModel,
     session: AsyncSession = Depends(get_session),
-) -> Book:
+) -> Response:
     book_with_tag = await tag_service.add_tags_to_book(
         book_uid=book_uid, tag_data=tag_data, session=session
     )
 
-    return book_with_tag
+    return json_response(Book, book_with_tag)
+
+
+@tags_router.post(
+    "/books", response_model=TagBulkAddResult, dependencies=[user_role_checker]
+)
+async def add_tags_to_books(
+    bulk_data: TagBulkAddModel,
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    links_created = await tag_service.add_tags_to_books(bulk_data, session)
+
+    return json_response(TagBulkAddResult, {"links_created": links_created})
 
 
 @tags_router.put(
@@ -58,10 +104,10 @@ async def update_tag(
     tag_uid: str,
     tag_update_data: TagCreateModel,
     session: AsyncSession = Depends(get_session),
-) -> TagModel:
+) -> Response:
     updated_tag = await tag_service.update_tag(tag_uid, tag_update_data, session)
 
-    return updated_tag
+    return json_response(TagModel, updated_tag)
 
 
 @tags_router.delete(
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class TagModel(BaseModel):
@@ -17,3 +17,12 @@ class TagCreateModel(BaseModel):
 
 class TagAddModel(BaseModel):
     tags: List[TagCreateModel]
+
+
+class TagBulkAddModel(BaseModel):
+    book_uids: List[uuid.UUID] = Field(..., min_length=1, max_length=10000)
+    tags: List[TagCreateModel] = Field(..., min_length=1)
+
+
+class TagBulkAddResult(BaseModel):
+    links_created: int
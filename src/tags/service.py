@@ -1,26 +1,64 @@
+import asyncio
+import logging
+import uuid
+from typing import Iterable, Sequence
+
 from fastapi import status
 from fastapi.exceptions import HTTPException
-from sqlmodel import desc, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import delete, desc, func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.books.service import BookService
-from src.db.models import Tag
+from src.config import Config
+from src.db.main import async_session_maker
+from src.db.models import Book, BookTag, Tag
+from src.db.redis import invalidate_book_cache, invalidate_book_caches
 from src.errors import BookNotFound, TagAlreadyExists, TagNotFound
 
-from .schemas import TagAddModel, TagCreateModel
+from .index import tag_index
+from .schemas import TagAddModel, TagBulkAddModel, TagCreateModel
 
 book_service = BookService()
+logger = logging.getLogger(__name__)
+
+
+def tags_version(tags: Sequence) -> str:
+    """Row count and newest updated_at: changes on any insert, rename or delete"""
+
+    last_updated = max(
+        (tag.updated_at for tag in tags if tag.updated_at is not None), default=None
+    )
+
+    return f"{len(tags)}:{last_updated}"
 
 
 class TagService:
-    async def get_tags(self, session: AsyncSession):
-        """Get all tags"""
+    async def get_tags(self, session: AsyncSession, fields: Sequence[str] = ()):
+        """Get all tags, as rows of only the given columns when fields is set.
 
-        statement = select(Tag).order_by(desc(Tag.created_at))
+        Projections also carry updated_at, which tags_version needs.
+        """
 
-        result = await session.execute(statement)
+        if fields:
+            columns = {*fields, "updated_at"}
+            statement = select(*(c for c in Tag.__table__.c if c.name in columns))
+        else:
+            statement = select(Tag)
 
-        return result.scalars().all()
+        result = await session.execute(statement.order_by(desc(Tag.created_at)))
+
+        return result.all() if fields else result.scalars().all()
+
+    async def get_tags_version(self, session: AsyncSession) -> str:
+        """tags_version of the whole list without loading it, for revalidation"""
+
+        result = await session.execute(select(func.count(), func.max(Tag.updated_at)))
+
+        count, last_updated = result.one()
+
+        return f"{count}:{last_updated}"
 
     async def add_tags_to_book(
         self, book_uid: str, tag_data: TagAddModel, session: AsyncSession
@@ -32,19 +70,91 @@ class TagService:
         if not book:
             raise BookNotFound()
 
-        for tag_item in tag_data.tags:
-            result = await session.execute(select(Tag).where(Tag.name == tag_item.name))
+        await self._attach_tags([book.uid], tag_data.tags, session)
 
-            tag = result.scalar_one_or_none()
-            if not tag:
-                tag = Tag(name=tag_item.name)
-
-            book.tags.append(tag)
-        session.add(book)
         await session.commit()
-        await session.refresh(book)
+
+        self._index_tags(tag_data.tags)
+
+        await invalidate_book_cache(book.uid)
+
         return book
 
+    async def add_tags_to_books(
+        self, bulk_data: TagBulkAddModel, session: AsyncSession
+    ):
+        """Add the same tags to many books in one transaction"""
+
+        links_created = await self._attach_tags(
+            bulk_data.book_uids, bulk_data.tags, session
+        )
+
+        await session.commit()
+
+        self._index_tags(bulk_data.tags)
+
+        await invalidate_book_caches(bulk_data.book_uids)
+
+        return links_created
+
+    async def _attach_tags(
+        self,
+        book_uids: Sequence[uuid.UUID],
+        tags: Iterable[TagCreateModel],
+        session: AsyncSession,
+    ) -> int:
+        """Create missing tags and link them to existing books, set-based"""
+
+        names = list(dict.fromkeys(tag.name for tag in tags))
+        if not names or not book_uids:
+            return 0
+
+        await session.execute(
+            insert(Tag)
+            .values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+
+        links = select(Book.uid, Tag.uid).where(
+            Book.uid.in_(book_uids), Tag.name.in_(names)
+        )
+        result = await session.execute(
+            insert(BookTag)
+            .from_select(["book_id", "tag_id"], links)
+            .on_conflict_do_nothing()
+            .returning(BookTag.book_id)
+        )
+        linked = result.scalars().all()
+
+        await book_service.touch_books(set(linked), session)
+
+        return len(linked)
+
+    def _index_tags(self, tags: Iterable[TagCreateModel]) -> None:
+        """Add attached tag names to the index; call only once committed"""
+
+        for tag in tags:
+            tag_index.add(tag.name)
+
+    async def load_tag_index(self, session: AsyncSession) -> None:
+        """Rebuild the in-process autocomplete index from the tags table"""
+
+        result = await session.execute(select(Tag.name))
+
+        tag_index.load(result.scalars().all())
+
+    def suggest_tags(self, prefix: str, limit: int):
+        """Tag names starting with prefix, served from the in-process index"""
+
+        return tag_index.suggest(prefix, limit)
+
+    async def _tagged_book_uids(self, tag_uid, session: AsyncSession):
+        result = await session.execute(
+            select(BookTag.book_id).where(BookTag.tag_id == tag_uid)
+        )
+
+        return result.scalars().all()
+
     async def get_tag_by_uid(self, tag_uid: str, session: AsyncSession):
         """Get tag by uid"""
 
@@ -52,7 +162,7 @@ class TagService:
 
         result = await session.execute(statement)
 
-        return result.first()
+        return result.scalars().first()
 
     async def add_tag(self, tag_data: TagCreateModel, session: AsyncSession):
         """Create a tag"""
@@ -72,6 +182,8 @@ class TagService:
 
         await session.commit()
 
+        tag_index.add(new_tag.name)
+
         return new_tag
 
     async def update_tag(
@@ -81,25 +193,68 @@ class TagService:
 
         tag = await self.get_tag_by_uid(tag_uid, session)
 
+        if not tag:
+            raise TagNotFound()
+
+        old_name = tag.name
+
+        statement = select(Tag.uid).where(
+            Tag.name == tag_update_data.name, Tag.uid != tag.uid
+        )
+
+        if await session.scalar(statement):
+            raise TagAlreadyExists()
+
         update_data_dict = tag_update_data.model_dump()
 
         for k, v in update_data_dict.items():
             setattr(tag, k, v)
 
-            await session.commit()
+        book_uids = await self._tagged_book_uids(tag.uid, session)
+
+        await book_service.touch_books(book_uids, session)
+
+        await session.commit()
+
+        await session.refresh(tag)
 
-            await session.refresh(tag)
+        tag_index.remove(old_name)
+        tag_index.add(tag.name)
+
+        await invalidate_book_caches(book_uids)
 
         return tag
 
     async def delete_tag(self, tag_uid: str, session: AsyncSession):
         """Delete a tag"""
 
-        tag = self.get_tag_by_uid(tag_uid, session)
+        tag = await self.get_tag_by_uid(tag_uid, session)
 
         if not tag:
             raise TagNotFound()
 
-        await session.delete(tag)
+        book_uids = await self._tagged_book_uids(tag.uid, session)
+
+        await book_service.touch_books(book_uids, session)
+
+        await session.execute(delete(BookTag).where(BookTag.tag_id == tag.uid))
+
+        await session.execute(delete(Tag).where(Tag.uid == tag.uid))
 
         await session.commit()
+
+        tag_index.remove(tag.name)
+
+        await invalidate_book_caches(book_uids)
+
+
+async def refresh_tag_index_forever() -> None:
+    """Reload the autocomplete index periodically so workers converge."""
+    tag_service = TagService()
+    while True:
+        try:
+            async with async_session_maker() as session:
+                await tag_service.load_tag_index(session)
+        except (OSError, SQLAlchemyError) as e:
+            logger.warning(f"Could not load tag index: {e}")
+        await asyncio.sleep(Config.TAG_INDEX_REFRESH_SECONDS)
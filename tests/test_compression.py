@@ -0,0 +1,30 @@
+import pytest
+
+from src.compression import choose_encoding
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("GZIP", "gzip"),
+        ("br", "br"),
+        ("gzip, deflate, br", "br"),
+        ("*", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0.5, gzip;q=0.5", "br"),
+        ("gzip;q=0.8, *;q=0.9", "br"),
+        ("br;q=0", None),
+        ("br;q=0, *", "gzip"),
+        ("br;q=0.000, *", "gzip"),
+        ("gzip;q=0, br;q=0, *", None),
+        ("*;q=0.3, gzip;q=0", "br"),
+        ("*;q=0", None),
+        ("gzip;q=abc, br;q=0", None),
+        ("gzip ; q=0.4 , deflate", "gzip"),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
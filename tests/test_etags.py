@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from src.books.service import page_version
+from src.db.etags import etag_matches, weak_etag
+from src.tags.service import tags_version
+
+UID = uuid.UUID("8f2b9c4e-1d3a-4b5c-9e7f-0a1b2c3d4e5f")
+
+ETAG = weak_etag("2025-03-14 15:09:26.535897+00:00")
+
+
+def request_with(if_none_match=None):
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_weak_etag_is_stable_and_weak():
+    assert ETAG == weak_etag("2025-03-14 15:09:26.535897+00:00")
+    assert ETAG.startswith('W/"') and ETAG.endswith('"')
+    assert weak_etag(1, 2) != weak_etag(12)
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        ETAG,
+        ETAG.removeprefix("W/"),
+        f'W/"other", {ETAG}',
+        f'"other",{ETAG}',
+        "*",
+        " * ",
+    ],
+)
+def test_matching_if_none_match(header):
+    assert etag_matches(request_with(header), ETAG)
+
+
+@pytest.mark.parametrize("header", [None, "", 'W/"other"', 'W/"other", "another"'])
+def test_non_matching_if_none_match(header):
+    assert not etag_matches(request_with(header), ETAG)
+
+
+def test_strong_etag_matches_weak_candidate():
+    assert etag_matches(request_with('W/"abc"'), '"abc"')
+
+
+def test_page_version_tracks_rows_and_next_page():
+    created = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    edited = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    book = SimpleNamespace(uid=UID, updated_at=created)
+    # A column projection row carries the same attributes as the entity.
+    row = SimpleNamespace(uid=UID, updated_at=created, title="Dune")
+
+    assert page_version([book], None) == page_version([row], None)
+    assert page_version([book], None) != page_version([book], "next")
+    assert page_version([book], None) != page_version(
+        [SimpleNamespace(uid=UID, updated_at=edited)], None
+    )
+    assert page_version([], None) != page_version([book], None)
+
+
+def test_tags_version_counts_rows_and_newest_update():
+    older = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    newer = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    tags = [
+        SimpleNamespace(updated_at=older),
+        SimpleNamespace(updated_at=newer),
+        SimpleNamespace(updated_at=None),
+    ]
+
+    assert tags_version(tags) == f"3:{newer}"
+    assert tags_version([]) == "0:None"
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import uuid
+
+from src.books import service
+from src.books.importer import iter_csv_rows, iter_ndjson_rows, iter_lines
+from src.books.service import BookService
+
+BOOK = {
+    "title": "Dune",
+    "author": "Frank Herbert",
+    "publisher": "Chilton",
+    "published_date": "1965-08-01",
+    "page_count": 412,
+    "language": "en",
+}
+CSV_HEADER = ",".join(BOOK)
+CSV_ROW = ",".join(str(value) for value in BOOK.values())
+
+
+async def chunked(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+def collect(rows) -> list:
+    async def run():
+        return [row async for row in rows]
+
+    return asyncio.run(run())
+
+
+def test_lines_split_across_chunk_boundaries():
+    body = "première\r\nsecond\n\nthird".encode()
+
+    for size in (1, 3, len(body)):
+        lines = collect(iter_lines(chunked(body, size)))
+        assert lines == ["première".encode(), b"second", b"", b"third"]
+
+
+def test_ndjson_rows_report_parse_errors_by_row():
+    body = "\n".join(
+        [json.dumps(BOOK), "", "{not json", "[1, 2]", json.dumps(BOOK)]
+    ).encode()
+
+    rows = collect(iter_ndjson_rows(chunked(body, 7)))
+
+    assert [(number, error) for number, _, error in rows] == [
+        (1, None),
+        (2, "invalid JSON: Expecting property name enclosed in double quotes"),
+        (3, "expected a JSON object"),
+        (4, None),
+    ]
+    assert rows[0][1] == BOOK
+
+
+def test_ndjson_rows_report_invalid_utf8_by_row():
+    body = b'{"title": "\xff"}\n' + json.dumps(BOOK).encode()
+
+    rows = collect(iter_ndjson_rows(chunked(body, 3)))
+
+    assert [(number, error) for number, _, error in rows] == [
+        (1, "invalid UTF-8: invalid start byte at byte 11"),
+        (2, None),
+    ]
+
+
+def test_csv_rows_report_column_mismatches_by_row():
+    body = "\n".join(
+        ["", CSV_HEADER, CSV_ROW, "", "Dune,Frank Herbert", CSV_ROW + ",extra"]
+    ).encode()
+
+    rows = collect(iter_csv_rows(chunked(body, 5)))
+
+    assert [(number, error) for number, _, error in rows] == [
+        (1, None),
+        (2, "expected 6 columns, got 2"),
+        (3, "expected 6 columns, got 7"),
+    ]
+    assert rows[0][1] == {name: str(value) for name, value in BOOK.items()}
+
+
+def test_csv_rows_report_invalid_utf8_by_row():
+    body = b"\n".join([CSV_HEADER.encode(), b"Dune\xc3,x", CSV_ROW.encode()])
+
+    rows = collect(iter_csv_rows(chunked(body, 5)))
+
+    assert [(number, error) for number, _, error in rows] == [
+        (1, "invalid UTF-8: invalid continuation byte at byte 4"),
+        (2, None),
+    ]
+
+
+def test_csv_header_with_invalid_utf8_ends_the_import():
+    body = b"\n".join([b"title\xff,author", CSV_ROW.encode()])
+
+    rows = collect(iter_csv_rows(chunked(body, 5)))
+
+    assert rows == [(0, None, "header: invalid UTF-8: invalid start byte at byte 5")]
+
+
+def test_csv_quoted_commas_stay_in_one_column():
+    body = f'{CSV_HEADER}\n"Dune, Part One",{CSV_ROW.split(",", 1)[1]}'.encode()
+
+    [(_, record, error)] = collect(iter_csv_rows(chunked(body, 4)))
+
+    assert error is None
+    assert record["title"] == "Dune, Part One"
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+
+class RecordingBookService(BookService):
+    def __init__(self):
+        self.written = []
+
+    async def _write_book_records(self, records, db_session):
+        self.written.extend(records)
+        return len(records)
+
+
+def import_rows_from(source, book_service=None):
+    book_service = book_service or RecordingBookService()
+    session = FakeSession()
+    report = asyncio.run(
+        book_service.import_books(source, str(uuid.uuid4()), session)
+    )
+    return report, book_service, session
+
+
+def import_rows(rows, book_service=None):
+    async def source():
+        for row in rows:
+            yield row
+
+    return import_rows_from(source(), book_service)
+
+
+def test_import_reports_invalid_rows_and_writes_valid_ones():
+    rows = [
+        (1, BOOK, None),
+        (2, None, "expected a JSON object"),
+        (3, {**BOOK, "page_count": "many"}, None),
+        (4, {**BOOK, "published_date": "08/01/1965"}, None),
+        (5, {"title": "Dune"}, None),
+        (6, BOOK, None),
+    ]
+
+    report, book_service, session = import_rows(rows)
+
+    assert report.imported == 2
+    assert report.failed == 4
+    assert [error.row for error in report.errors] == [2, 3, 4, 5]
+    assert report.errors[0].errors == ["expected a JSON object"]
+    assert report.errors[1].errors[0].startswith("page_count: ")
+    assert "does not match format" in report.errors[2].errors[0]
+    assert len(report.errors[3].errors) == 5
+    assert len(book_service.written) == 2
+    assert session.commits == 1
+
+
+def test_import_reports_undecodable_lines_instead_of_failing():
+    body = b"\n".join([json.dumps(BOOK).encode(), b'{"title": "\xff"}'])
+
+    report, book_service, _ = import_rows_from(iter_ndjson_rows(chunked(body, 8)))
+
+    assert report.imported == 1
+    assert report.failed == 1
+    assert report.errors[0].row == 2
+    assert report.errors[0].errors[0].startswith("invalid UTF-8: ")
+
+
+def test_import_caps_reported_errors(monkeypatch):
+    monkeypatch.setattr(service, "MAX_REPORTED_IMPORT_ERRORS", 3)
+    rows = [(number, None, "expected a JSON object") for number in range(1, 11)]
+
+    report, _, _ = import_rows(rows)
+
+    assert report.failed == 10
+    assert [error.row for error in report.errors] == [1, 2, 3]
+
+
+def test_import_writes_in_chunks(monkeypatch):
+    monkeypatch.setattr(service, "IMPORT_CHUNK_SIZE", 2)
+    chunks = []
+
+    class ChunkRecordingService(RecordingBookService):
+        async def _write_book_records(self, records, db_session):
+            chunks.append(len(records))
+            return await super()._write_book_records(records, db_session)
+
+    rows = [(number, BOOK, None) for number in range(1, 6)]
+
+    report, _, _ = import_rows(rows, ChunkRecordingService())
+
+    assert report.imported == 5
+    assert chunks == [2, 2, 1]
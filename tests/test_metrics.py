@@ -0,0 +1,73 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from src.middleware import RequestTimingMiddleware
+
+
+def request_count(method: str, route: str, status: str = "200") -> float:
+    labels = {"method": method, "route": route, "status": status}
+    return REGISTRY.get_sample_value("http_requests_total", labels) or 0.0
+
+
+def make_app() -> FastAPI:
+    shelves = APIRouter()
+    readers = APIRouter()
+
+    @shelves.get("/")
+    async def list_shelves():
+        return []
+
+    @shelves.get("/{item_id}")
+    async def get_shelf(item_id: str):
+        return {}
+
+    @readers.get("/")
+    async def list_readers():
+        return []
+
+    @readers.get("/{item_id}")
+    async def get_reader(item_id: str):
+        return {}
+
+    app = FastAPI()
+    app.include_router(shelves, prefix="/api/v1/shelves")
+    app.include_router(readers, prefix="/api/v1/readers")
+    app.add_middleware(RequestTimingMiddleware)
+    return app
+
+
+def test_routers_with_the_same_relative_path_get_distinct_labels():
+    client = TestClient(make_app())
+    routes = [
+        "/api/v1/shelves/",
+        "/api/v1/readers/",
+        "/api/v1/shelves/{item_id}",
+        "/api/v1/readers/{item_id}",
+    ]
+    before = {route: request_count("GET", route) for route in routes}
+
+    client.get("/api/v1/shelves/")
+    client.get("/api/v1/readers/")
+    client.get("/api/v1/readers/")
+    client.get("/api/v1/shelves/1")
+    client.get("/api/v1/readers/2")
+    client.get("/api/v1/readers/3")
+
+    counts = {route: request_count("GET", route) - before[route] for route in routes}
+    assert counts == {
+        "/api/v1/shelves/": 1,
+        "/api/v1/readers/": 2,
+        "/api/v1/shelves/{item_id}": 1,
+        "/api/v1/readers/{item_id}": 2,
+    }
+
+
+def test_unmatched_paths_share_one_label():
+    client = TestClient(make_app())
+    before = request_count("GET", "<unmatched>", "404")
+
+    client.get("/nowhere")
+    client.get("/api/v1/shelves/1/extra")
+
+    assert request_count("GET", "<unmatched>", "404") - before == 2
@@ -0,0 +1,87 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.db.pagination import (
+    _encode,
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+from src.errors import InvalidCursor, register_error_handlers
+
+UID = uuid.UUID("8f2b9c4e-1d3a-4b5c-9e7f-0a1b2c3d4e5f")
+CREATED_AT = datetime(2025, 3, 14, 15, 9, 26, 535897, tzinfo=timezone.utc)
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(CREATED_AT, UID)
+
+    assert decode_cursor(cursor) == (CREATED_AT, UID)
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(CREATED_AT, UID)
+
+    assert "=" not in cursor
+    assert set(cursor) <= set(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    )
+
+
+def test_rank_cursor_round_trip():
+    cursor = encode_rank_cursor(0.0759909, UID)
+
+    assert decode_rank_cursor(cursor) == (0.0759909, UID)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        "%%%",
+        "é",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        _encode("2025-03-14T15:09:26"),
+        _encode(["2025-03-14T15:09:26"]),
+        _encode(["2025-03-14T15:09:26", str(UID), "extra"]),
+        _encode(["yesterday", str(UID)]),
+        _encode(["2025-03-14T15:09:26", "not-a-uuid"]),
+        _encode([None, str(UID)]),
+        _encode(["2025-03-14T15:09:26", 7]),
+        _encode({"created_at": "2025-03-14T15:09:26", "uid": str(UID)}),
+    ],
+)
+def test_malformed_cursor_raises_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["not-a-cursor", _encode(["high", str(UID)]), _encode([0.5, 7])],
+)
+def test_malformed_rank_cursor_raises_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_rank_cursor(cursor)
+
+
+def test_malformed_cursor_is_a_400():
+    app = FastAPI()
+    register_error_handlers(app)
+
+    @app.get("/items")
+    async def items(cursor: str):
+        decode_cursor(cursor)
+        return []
+
+    response = TestClient(app).get("/items", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "invalid_cursor"
@@ -0,0 +1,140 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.auth import service
+from src.auth.schemas import UserPrincipal
+from src.auth.service import PrincipalCache, UserService
+from src.db import redis
+from src.db.main import INVALIDATED_PRINCIPALS, PrimarySession
+from src.db.models import User
+from src.db.redis import BLOCKLIST_CHANNEL, RevocationCache
+
+USER_UID = uuid.UUID("3f2e1d0c-9b8a-4765-8432-10fedcba9876")
+
+
+def principal(role="user"):
+    return UserPrincipal(uid=USER_UID, email="a@b.co", role=role, is_verified=True)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(service.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = PrincipalCache(ttl=30)
+    monkeypatch.setattr(service, "principal_cache", cache)
+    return cache
+
+
+def test_entries_expire_with_the_ttl(clock):
+    cache = PrincipalCache(ttl=30)
+    cache.put(principal())
+
+    assert cache.get(str(USER_UID)) == principal()
+
+    clock[0] += 30
+
+    assert cache.get(str(USER_UID)) is None
+
+
+class CountingSession:
+    def __init__(self, row):
+        self.row = row
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return self
+
+    def first(self):
+        return self.row
+
+
+def test_principal_lookups_hit_the_cache(cache):
+    session = CountingSession(principal())
+    user_service = UserService()
+
+    first = asyncio.run(user_service.get_user_principal(str(USER_UID), session))
+    second = asyncio.run(user_service.get_user_principal(str(USER_UID), session))
+
+    assert first == second == principal()
+    assert session.queries == 1
+
+
+def test_updating_a_user_invalidates_its_principal(cache):
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    with Session(engine) as session:
+        user = User(
+            uid=USER_UID,
+            username="reader",
+            first_name="A",
+            last_name="B",
+            email="a@b.co",
+            password_hash="hash",
+            role="user",
+        )
+        session.add(user)
+        session.commit()
+        cache.put(principal())
+
+        user.role = "admin"
+        session.flush()
+
+        assert cache.get(str(USER_UID)) is None
+        assert session.info[INVALIDATED_PRINCIPALS] == {str(USER_UID)}
+
+
+def test_commit_publishes_invalidated_principals(fake_redis):
+    async def run():
+        session = PrimarySession()
+        session.info[INVALIDATED_PRINCIPALS] = {str(USER_UID)}
+        await session.commit()
+        await session.close()
+        return session
+
+    session = asyncio.run(run())
+
+    assert fake_redis.published == [(BLOCKLIST_CHANNEL, f"principal:{USER_UID}")]
+    assert INVALIDATED_PRINCIPALS not in session.info
+
+
+def test_invalidations_published_by_other_workers_reach_the_cache(
+    fake_redis, cache, monkeypatch
+):
+    revocations = RevocationCache()
+    revocations.on_principal_invalidated = cache.invalidate
+    monkeypatch.setattr(redis, "revocation_cache", revocations)
+    cache.put(principal())
+
+    async def run():
+        listener = asyncio.create_task(revocations.listen())
+        while not revocations.subscribed:
+            await asyncio.sleep(0)
+
+        await redis.publish_principal_invalidations([str(USER_UID)])
+        for _ in range(100):
+            if cache.get(str(USER_UID)) is None:
+                break
+            await asyncio.sleep(0)
+
+        listener.cancel()
+
+    asyncio.run(run())
+
+    assert cache.get(str(USER_UID)) is None
+    assert not revocations.revoked
+
+
+def test_module_cache_follows_the_channel():
+    assert redis.revocation_cache.on_principal_invalidated == (
+        service.principal_cache.invalidate
+    )
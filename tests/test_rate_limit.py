@@ -0,0 +1,163 @@
+import asyncio
+import math
+import uuid
+
+import pytest
+from fastapi import Response
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src import rate_limit
+from src.config import Config
+from src.errors import RateLimitExceeded
+from src.rate_limit import TOKEN_BUCKET_SCRIPT, RateLimiter, parse_limit
+
+
+@pytest.fixture(scope="module")
+def redis_available():
+    async def ping():
+        client = Redis(
+            host=Config.REDIS_HOST, port=Config.REDIS_PORT, socket_connect_timeout=1
+        )
+        try:
+            return await client.ping()
+        except (RedisError, OSError):
+            return False
+        finally:
+            await client.aclose()
+
+    if not asyncio.run(ping()):
+        pytest.skip("Redis is not reachable")
+
+
+def run_token_bucket(scenario):
+    """Run scenario(take, client, key) against the Lua script on a live Redis."""
+
+    async def run():
+        client = Redis(host=Config.REDIS_HOST, port=Config.REDIS_PORT)
+        script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        key = f"rate_limit:test:{uuid.uuid4()}"
+
+        async def take(capacity, rate):
+            allowed, tokens = await script(keys=[key], args=[capacity, rate])
+            return allowed, float(tokens)
+
+        try:
+            await scenario(take, client, key)
+        finally:
+            await client.delete(key)
+            await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_script_allows_a_burst_then_refuses(redis_available):
+    async def scenario(take, client, key):
+        results = [await take(3, 0.001) for _ in range(4)]
+
+        assert [allowed for allowed, _ in results] == [1, 1, 1, 0]
+        assert [math.floor(tokens) for _, tokens in results] == [2, 1, 0, 0]
+
+    run_token_bucket(scenario)
+
+
+def test_script_refills_over_time(redis_available):
+    async def scenario(take, client, key):
+        assert (await take(1, 20))[0] == 1
+        assert (await take(1, 20))[0] == 0
+
+        await asyncio.sleep(0.1)
+
+        assert (await take(1, 20))[0] == 1
+
+    run_token_bucket(scenario)
+
+
+def test_script_keeps_fractional_tokens(redis_available):
+    async def scenario(take, client, key):
+        await take(3, 10)
+        await asyncio.sleep(0.05)
+        _, tokens = await take(3, 10)
+
+        # Lua numbers come back truncated; the string keeps the fraction.
+        assert 1 < tokens < 2.5
+
+    run_token_bucket(scenario)
+
+
+def test_script_expires_idle_buckets(redis_available):
+    async def scenario(take, client, key):
+        await take(10, 2)
+
+        assert 0 < await client.pttl(key) <= 5000
+
+    run_token_bucket(scenario)
+
+
+def test_parse_limit():
+    assert parse_limit("10/60") == (10, 60.0)
+    assert parse_limit("5/0.5") == (5, 0.5)
+
+
+@pytest.fixture
+def local_only(monkeypatch):
+    """Act as if Redis just failed, so limiters use their local buckets."""
+    monkeypatch.setattr(RateLimiter, "redis_retry_at", math.inf)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_local_bucket_allows_a_burst_then_refuses(clock):
+    limiter = RateLimiter("test", "2/10")
+
+    assert limiter._take_local("k") == (True, 1)
+    assert limiter._take_local("k") == (True, 0)
+    assert limiter._take_local("k") == (False, 0)
+    assert limiter._take_local("other") == (True, 1)
+
+
+def test_local_bucket_refills_up_to_capacity(clock):
+    limiter = RateLimiter("test", "2/10")
+    limiter._take_local("k")
+    limiter._take_local("k")
+
+    clock[0] += 5
+    assert limiter._take_local("k") == (True, 0)
+
+    clock[0] += 1000
+    assert limiter._take_local("k") == (True, 1)
+
+
+def test_local_buckets_stay_bounded(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, "MAX_LOCAL_BUCKETS", 3)
+    limiter = RateLimiter("test", "2/10")
+    for key in ("a", "b", "c"):
+        limiter._take_local(key)
+
+    clock[0] += 10
+    limiter._take_local("d")
+
+    assert list(limiter.local) == ["d"]
+
+
+def test_hit_sets_headers_and_raises_with_retry_after(clock, local_only):
+    limiter = RateLimiter("test", "2/10")
+    response = Response()
+
+    asyncio.run(limiter.hit("client", response))
+
+    assert response.headers["RateLimit-Limit"] == "2"
+    assert response.headers["RateLimit-Remaining"] == "1"
+    assert response.headers["RateLimit-Policy"] == "2;w=10"
+
+    asyncio.run(limiter.hit("client", Response()))
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        asyncio.run(limiter.hit("client", Response()))
+
+    assert excinfo.value.headers["Retry-After"] == "5"
+    assert excinfo.value.headers["RateLimit-Remaining"] == "0"
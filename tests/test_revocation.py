@@ -0,0 +1,152 @@
+import asyncio
+import time
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.db import redis
+from src.db.redis import (
+    BLOCKLIST_CHANNEL,
+    LEGACY_BLOCKLIST_UNTIL_KEY,
+    RevocationCache,
+    add_jti_to_blocklist,
+    is_token_in_blocklist,
+)
+
+JTI = "0b9a1f3c-5e6d-4c7b-8a9f-1e2d3c4b5a69"
+LEGACY_JTI = "7c6b5a49-3827-4165-9f8e-7d6c5b4a3928"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = RevocationCache()
+    monkeypatch.setattr(redis, "revocation_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(redis.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_with_their_ttl(clock):
+    cache = RevocationCache()
+    cache.add(JTI, ttl=10)
+
+    assert cache.contains(JTI)
+
+    clock[0] += 10
+
+    assert not cache.contains(JTI)
+    assert JTI not in cache.revoked
+
+
+def test_prune_drops_only_expired_entries(clock):
+    cache = RevocationCache()
+    cache.add("short", ttl=5)
+    cache.add("long", ttl=50)
+
+    clock[0] += 10
+    cache.prune()
+
+    assert list(cache.revoked) == ["long"]
+
+
+def test_warm_loads_prefixed_and_legacy_keys(fake_redis, cache):
+    fake_redis.values = {
+        f"revoked:{JTI}": b"true",
+        LEGACY_JTI: b"true",
+        "primary_pin:1b2c3d4e-5f60-7182-93a4-b5c6d7e8f901": b"true",
+        "book_detail:v2:1b2c3d4e-5f60-7182-93a4-b5c6d7e8f901": b"{}",
+    }
+    fake_redis.ttls = {f"revoked:{JTI}": 100, LEGACY_JTI: 50}
+
+    asyncio.run(cache.warm())
+
+    assert set(cache.revoked) == {JTI, LEGACY_JTI}
+    assert float(fake_redis.values[LEGACY_BLOCKLIST_UNTIL_KEY]) > time.time()
+
+
+def test_warm_ignores_legacy_keys_after_the_deadline(fake_redis, cache):
+    fake_redis.values = {
+        LEGACY_BLOCKLIST_UNTIL_KEY: str(time.time() - 1).encode(),
+        f"revoked:{JTI}": b"true",
+        LEGACY_JTI: b"true",
+    }
+    fake_redis.ttls = {f"revoked:{JTI}": 100, LEGACY_JTI: 50}
+
+    asyncio.run(cache.warm())
+
+    assert set(cache.revoked) == {JTI}
+    assert not cache.legacy_keys_live
+
+
+def test_revoking_stores_a_prefixed_key_and_publishes(fake_redis, cache):
+    asyncio.run(add_jti_to_blocklist(JTI))
+
+    assert fake_redis.values[f"revoked:{JTI}"] == b"true"
+    assert fake_redis.published == [(BLOCKLIST_CHANNEL, JTI)]
+    assert cache.contains(JTI)
+
+
+def test_lookup_trusts_the_local_set_while_subscribed(fake_redis, cache):
+    fake_redis.values[f"revoked:{JTI}"] = b"true"
+    cache.subscribed = True
+
+    assert asyncio.run(is_token_in_blocklist(JTI)) is False
+
+    cache.add(JTI)
+
+    assert asyncio.run(is_token_in_blocklist(JTI)) is True
+
+
+def test_lookup_asks_redis_while_unsubscribed(fake_redis, cache):
+    fake_redis.values[f"revoked:{JTI}"] = b"true"
+    fake_redis.values[LEGACY_JTI] = b"true"
+
+    assert asyncio.run(is_token_in_blocklist(JTI)) is True
+    assert asyncio.run(is_token_in_blocklist(LEGACY_JTI)) is True
+    assert asyncio.run(is_token_in_blocklist("never-revoked")) is False
+
+    cache.legacy_until = time.time() - 1
+
+    assert asyncio.run(is_token_in_blocklist(LEGACY_JTI)) is False
+
+
+async def wait_for(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition never became true")
+
+
+def test_revocations_published_by_other_workers_reach_the_cache(fake_redis, cache):
+    async def run():
+        listener = asyncio.create_task(cache.listen())
+        await wait_for(lambda: cache.subscribed)
+
+        await fake_redis.publish(BLOCKLIST_CHANNEL, JTI)
+        await wait_for(lambda: cache.contains(JTI))
+
+        listener.cancel()
+
+    asyncio.run(run())
+
+
+def test_lost_subscription_is_noticed_and_resubscribed(fake_redis, cache):
+    async def run():
+        listener = asyncio.create_task(cache.listen(retry_seconds=0))
+        await wait_for(lambda: cache.subscribed)
+
+        [subscriber] = fake_redis.subscribers
+        await subscriber.messages.put(ConnectionError("connection reset"))
+        await wait_for(lambda: not cache.subscribed)
+        await wait_for(lambda: cache.subscribed)
+
+        assert fake_redis.subscribers != [subscriber]
+        listener.cancel()
+
+    asyncio.run(run())
@@ -0,0 +1,66 @@
+from src.tags.index import TagPrefixIndex
+
+
+def make_index(*names):
+    index = TagPrefixIndex()
+    index.load(names)
+    return index
+
+
+def test_suggest_matches_prefix_case_insensitively():
+    index = make_index("Python", "pytest", "Rust", "PyPy")
+
+    assert index.suggest("py", 10) == ["PyPy", "pytest", "Python"]
+    assert index.suggest("PY", 10) == ["PyPy", "pytest", "Python"]
+
+
+def test_suggest_respects_limit():
+    index = make_index("a1", "a2", "a3", "b1")
+
+    assert index.suggest("a", 2) == ["a1", "a2"]
+
+
+def test_suggest_without_matches():
+    index = make_index("fantasy", "history")
+
+    assert index.suggest("sci", 10) == []
+    assert make_index().suggest("a", 10) == []
+
+
+def test_empty_prefix_returns_everything_in_order():
+    index = make_index("b", "A", "c")
+
+    assert index.suggest("", 10) == ["A", "b", "c"]
+
+
+def test_load_replaces_contents_and_drops_duplicates():
+    index = make_index("old")
+    index.load(["new", "new"])
+
+    assert index.suggest("", 10) == ["new"]
+
+
+def test_add_is_idempotent():
+    index = make_index("poetry")
+    index.add("poetry")
+    index.add("Poem")
+
+    assert index.suggest("po", 10) == ["Poem", "poetry"]
+
+
+def test_names_differing_only_in_case_are_separate_entries():
+    index = make_index("sql", "SQL")
+
+    assert sorted(index.suggest("sq", 10)) == ["SQL", "sql"]
+
+    index.remove("SQL")
+
+    assert index.suggest("sq", 10) == ["sql"]
+
+
+def test_remove_missing_name_is_a_no_op():
+    index = make_index("drama")
+    index.remove("comedy")
+    index.remove("Drama")
+
+    assert index.suggest("", 10) == ["drama"]
@@ -0,0 +1,93 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from src.auth import utils
+from src.auth.utils import VerifiedTokenCache, create_access_token, decode_access_token
+
+
+def claims(exp_in: float = 60, **extra) -> dict:
+    return {"exp": time.time() + exp_in, **extra}
+
+
+def test_hit_returns_the_cached_claims():
+    cache = VerifiedTokenCache(maxsize=2)
+    token_claims = claims(user="a")
+    cache.put("token", token_claims)
+
+    assert cache.get("token") is token_claims
+    assert cache.get("other") is None
+
+
+def test_entries_expire_at_the_token_exp(monkeypatch):
+    cache = VerifiedTokenCache(maxsize=2)
+    cache.put("token", claims(exp_in=10))
+
+    now = time.time()
+    monkeypatch.setattr(utils.time, "time", lambda: now + 10)
+
+    assert cache.get("token") is None
+    assert "token" not in cache._entries
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerifiedTokenCache(maxsize=2)
+    cache.put("a", claims())
+    cache.put("b", claims())
+    cache.get("a")
+    cache.put("c", claims())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.parametrize(
+    "maxsize, token_claims", [(0, claims()), (2, {"user": "no exp"})]
+)
+def test_uncacheable_claims_are_not_stored(maxsize, token_claims):
+    cache = VerifiedTokenCache(maxsize=maxsize)
+    cache.put("token", token_claims)
+
+    assert cache.get("token") is None
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = VerifiedTokenCache(maxsize=8)
+    monkeypatch.setattr(utils, "verified_tokens", cache)
+    return cache
+
+
+@pytest.fixture
+def count_decodes(monkeypatch):
+    calls = []
+    decode = utils.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(utils.jwt, "decode", counting_decode)
+    return calls
+
+
+def test_decode_verifies_a_token_once(fresh_cache, count_decodes):
+    token = create_access_token({"user_uid": "u1"}, expiry=timedelta(minutes=5))
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+
+    assert first["user"] == {"user_uid": "u1"}
+    assert second is first
+    assert len(count_decodes) == 1
+
+
+def test_invalid_tokens_are_not_cached(fresh_cache, count_decodes):
+    token = create_access_token({"user_uid": "u1"}) + "tampered"
+
+    assert decode_access_token(token) is None
+    assert decode_access_token(token) is None
+    assert len(count_decodes) == 2
+    assert not fresh_cache._entries